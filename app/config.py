@@ -32,6 +32,7 @@ def load_config() -> Dict[str, Any]:
     config['azure'] = config.get('azure', {})
     config['video'] = config.get('video', {})
     config['payment'] = config.get('payment', {})
+    config['render'] = config.get('render', {})
     
     # LLM Configuration
     config['app']['llm_provider'] = os.getenv('LLM_PROVIDER', config['app'].get('llm_provider', 'openrouter'))
@@ -50,6 +51,10 @@ def load_config() -> Dict[str, Any]:
     # Azure Speech Configuration
     config['azure']['speech_key'] = os.getenv('AZURE_SPEECH_KEY', config['azure'].get('speech_key', ''))
     config['azure']['speech_region'] = os.getenv('AZURE_SPEECH_REGION', config['azure'].get('speech_region', 'eastus'))
+    config['azure']['speech_concurrency'] = int(os.getenv('AZURE_SPEECH_CONCURRENCY', config['azure'].get('speech_concurrency', 4)))
+    config['azure']['speech_max_concurrency'] = int(os.getenv('AZURE_SPEECH_MAX_CONCURRENCY', config['azure'].get('speech_max_concurrency', 32)))
+    config['azure']['synthesizer_pool_size'] = int(os.getenv('AZURE_SYNTHESIZER_POOL_SIZE', config['azure'].get('synthesizer_pool_size', 16)))
+    config['azure']['speech_max_retries'] = int(os.getenv('AZURE_SPEECH_MAX_RETRIES', config['azure'].get('speech_max_retries', 4)))
     
     # Video Source Configuration
     pexels_keys = os.getenv('PEXELS_API_KEYS', '')
@@ -73,6 +78,48 @@ def load_config() -> Dict[str, Any]:
     config['video']['temp_dir'] = os.getenv('VIDEO_TEMP_DIR', config['video'].get('temp_dir', './temp'))
     config['video']['max_duration'] = int(os.getenv('VIDEO_MAX_DURATION', config['video'].get('max_duration', 180)))
     config['video']['default_resolution'] = os.getenv('VIDEO_DEFAULT_RESOLUTION', config['video'].get('default_resolution', '1920x1080'))
+    config['video']['clip_cache_dir'] = os.getenv('VIDEO_CLIP_CACHE_DIR', config['video'].get('clip_cache_dir', ''))
+    config['video']['script_cache_dir'] = os.getenv('VIDEO_SCRIPT_CACHE_DIR', config['video'].get('script_cache_dir', ''))
+    config['video']['tts_backend'] = os.getenv('VIDEO_TTS_BACKEND', config['video'].get('tts_backend', 'azure'))
+    config['video']['tts_local_latency'] = float(os.getenv('VIDEO_TTS_LOCAL_LATENCY', config['video'].get('tts_local_latency', 0.0)))
+    config['video']['tts_mode'] = os.getenv('VIDEO_TTS_MODE', config['video'].get('tts_mode', 'scenes'))
+    config['video']['tts_concurrency'] = int(os.getenv('VIDEO_TTS_CONCURRENCY', config['video'].get('tts_concurrency', 4)))
+    config['video']['scene_pause'] = float(os.getenv('VIDEO_SCENE_PAUSE', config['video'].get('scene_pause', 0.3)))
+    config['video']['subtitle_mode'] = os.getenv('VIDEO_SUBTITLE_MODE', config['video'].get('subtitle_mode', 'burn'))
+    config['video']['subtitle_alignment'] = os.getenv('VIDEO_SUBTITLE_ALIGNMENT', config['video'].get('subtitle_alignment', 'recognition'))
+    config['video']['recognition_chunk_seconds'] = float(os.getenv('VIDEO_RECOGNITION_CHUNK_SECONDS', config['video'].get('recognition_chunk_seconds', 30.0)))
+    config['video']['clip_library_dir'] = os.getenv('VIDEO_CLIP_LIBRARY_DIR', config['video'].get('clip_library_dir', ''))
+    config['video']['clip_library_min_score'] = float(os.getenv('VIDEO_CLIP_LIBRARY_MIN_SCORE', config['video'].get('clip_library_min_score', 0.5)))
+    clip_providers = os.getenv('VIDEO_CLIP_PROVIDERS', '')
+    if clip_providers:
+        config['video']['clip_providers'] = [name.strip() for name in clip_providers.split(',') if name.strip()]
+    else:
+        config['video']['clip_providers'] = config['video'].get('clip_providers', ['pexels', 'pixabay'])
+    config['video']['search_hedge_delay'] = float(os.getenv('VIDEO_SEARCH_HEDGE_DELAY', config['video'].get('search_hedge_delay', 2.0)))
+    config['video']['search_concurrency'] = int(os.getenv('VIDEO_SEARCH_CONCURRENCY', config['video'].get('search_concurrency', 4)))
+    config['video']['search_cache'] = os.getenv('VIDEO_SEARCH_CACHE', config['video'].get('search_cache', ''))
+    config['video']['search_cache_dir'] = os.getenv('VIDEO_SEARCH_CACHE_DIR', config['video'].get('search_cache_dir', './.cache/search'))
+    config['video']['search_cache_ttl'] = int(os.getenv('VIDEO_SEARCH_CACHE_TTL', config['video'].get('search_cache_ttl', 86400)))
+    config['video']['search_cache_purge_interval'] = int(os.getenv('VIDEO_SEARCH_CACHE_PURGE_INTERVAL', config['video'].get('search_cache_purge_interval', 3600)))
+    config['video']['tts_cache_dir'] = os.getenv('VIDEO_TTS_CACHE_DIR', config['video'].get('tts_cache_dir', ''))
+    config['video']['tts_cache_max_mb'] = int(os.getenv('VIDEO_TTS_CACHE_MAX_MB', config['video'].get('tts_cache_max_mb', 1024)))
+    
+    # Render Queue Configuration
+    config['render']['mode'] = os.getenv('RENDER_MODE', config['render'].get('mode', 'inprocess'))
+    config['render']['shared_dir'] = os.getenv('RENDER_SHARED_DIR', config['render'].get('shared_dir', './shared'))
+    config['render']['poll_interval'] = float(os.getenv('RENDER_POLL_INTERVAL', config['render'].get('poll_interval', 2.0)))
+    config['render']['heartbeat_interval'] = float(os.getenv('RENDER_HEARTBEAT_INTERVAL', config['render'].get('heartbeat_interval', 10.0)))
+    config['render']['cancel_poll_interval'] = float(os.getenv('RENDER_CANCEL_POLL_INTERVAL', config['render'].get('cancel_poll_interval', 2.0)))
+    config['render']['progress_interval'] = float(os.getenv('RENDER_PROGRESS_INTERVAL', config['render'].get('progress_interval', 1.0)))
+    config['render']['stale_after'] = int(os.getenv('RENDER_STALE_AFTER', config['render'].get('stale_after', 60)))
+    config['render']['max_attempts'] = int(os.getenv('RENDER_MAX_ATTEMPTS', config['render'].get('max_attempts', 3)))
+    config['render']['concurrency'] = int(os.getenv('RENDER_CONCURRENCY', config['render'].get('concurrency', 1)))
+    config['render']['cpu_budget'] = int(os.getenv('RENDER_CPU_BUDGET', config['render'].get('cpu_budget', 0)))
+    config['render']['memory_budget_mb'] = int(os.getenv('RENDER_MEMORY_BUDGET_MB', config['render'].get('memory_budget_mb', 0)))
+    config['render']['lane_weights'] = config['render'].get('lane_weights', {'credit': 3, 'trial': 1})
+    config['render']['lane_max_wait'] = int(os.getenv('RENDER_LANE_MAX_WAIT', config['render'].get('lane_max_wait', 300)))
+    config['render']['follow_timeout'] = int(os.getenv('RENDER_FOLLOW_TIMEOUT', config['render'].get('follow_timeout', 3600)))
+    config['render']['dedup_window'] = int(os.getenv('RENDER_DEDUP_WINDOW', config['render'].get('dedup_window', 3600)))
     
     return config
 
@@ -113,11 +160,12 @@ def validate_config() -> tuple[bool, list[str]]:
         errors.append("DeepSeek API key is required when using DeepSeek as LLM provider")
     
     # Check video source API keys
-    if not config['app'].get('pexels_api_keys') and not config['app'].get('pixabay_api_keys'):
-        errors.append("At least one video source API key (Pexels or Pixabay) is required")
+    if not config['app'].get('pexels_api_keys') and not config['app'].get('pixabay_api_keys') \
+            and not config['video'].get('clip_library_dir'):
+        errors.append("At least one video source API key (Pexels or Pixabay) or a clip library is required")
     
     # Check Azure Speech key for voice synthesis
-    if not config['azure'].get('speech_key'):
+    if config['video'].get('tts_backend', 'azure') == 'azure' and not config['azure'].get('speech_key'):
         errors.append("Azure Speech API key is required for voice synthesis")
     
     return len(errors) == 0, errors
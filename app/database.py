@@ -4,16 +4,27 @@ Handles PostgreSQL connections and operations
 """
 
 import os
+import json
+import select
 from dotenv import load_dotenv
 import psycopg2
-from psycopg2.extras import RealDictCursor
-from typing import Dict, Any, List, Optional
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from psycopg2.extras import RealDictCursor, Json
+from typing import Dict, Any, List, Optional, Iterator
 from datetime import datetime
 import uuid
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Job states after which no more progress events are published
+RENDER_JOB_TERMINAL_STATES = ('completed', 'failed', 'cancelled')
+
+
+def render_job_channel(job_id: str) -> str:
+    """NOTIFY channel carrying a render job's progress events"""
+    return f"render_job_{job_id.replace('-', '')}"
+
 
 class Database:
     """Database connection and operations manager"""
@@ -75,6 +86,60 @@ class Database:
                     )
                 """)
                 
+                # Render jobs table (shared queue for render workers)
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS render_jobs (
+                        id VARCHAR(36) PRIMARY KEY,
+                        user_id VARCHAR(36) REFERENCES users(id),
+                        params JSONB NOT NULL,
+                        status VARCHAR(50) DEFAULT 'queued',
+                        worker_id VARCHAR(255),
+                        attempts INTEGER DEFAULT 0,
+                        output_path TEXT,
+                        error TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        claimed_at TIMESTAMP,
+                        heartbeat_at TIMESTAMP,
+                        completed_at TIMESTAMP
+                    )
+                """)
+                
+                # Priority lanes for render jobs (credit, trial)
+                cur.execute("""
+                    ALTER TABLE render_jobs ADD COLUMN IF NOT EXISTS lane VARCHAR(20) DEFAULT 'credit'
+                """)
+                cur.execute("""
+                    ALTER TABLE render_jobs ADD COLUMN IF NOT EXISTS priority INTEGER DEFAULT 0
+                """)
+                
+                # Request fingerprint for deduplicating identical renders
+                cur.execute("""
+                    ALTER TABLE render_jobs ADD COLUMN IF NOT EXISTS fingerprint VARCHAR(64)
+                """)
+                
+                # Cancellation flag polled by the worker rendering the job
+                cur.execute("""
+                    ALTER TABLE render_jobs ADD COLUMN IF NOT EXISTS cancel_requested BOOLEAN DEFAULT FALSE
+                """)
+                
+                # Latest progress event published for the job
+                cur.execute("""
+                    ALTER TABLE render_jobs ADD COLUMN IF NOT EXISTS progress JSONB
+                """)
+                cur.execute("""
+                    ALTER TABLE render_jobs ADD COLUMN IF NOT EXISTS progress_at TIMESTAMP
+                """)
+                
+                # Stock footage search responses, keyed by canonicalized query
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS clip_search_cache (
+                        key VARCHAR(64) PRIMARY KEY,
+                        query TEXT NOT NULL,
+                        response JSONB NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                
                 # Create indexes for better query performance
                 cur.execute("""
                     CREATE INDEX IF NOT EXISTS idx_videos_user_id ON videos(user_id)
@@ -85,6 +150,20 @@ class Database:
                 cur.execute("""
                     CREATE INDEX IF NOT EXISTS idx_transactions_payment_id ON transactions(payment_id)
                 """)
+                cur.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_render_jobs_status ON render_jobs(status, created_at)
+                """)
+                cur.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_render_jobs_lane ON render_jobs(status, lane, created_at)
+                """)
+                cur.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_render_jobs_fingerprint ON render_jobs(fingerprint, completed_at)
+                """)
+                # At most one queued/running job per fingerprint (single-flight across replicas)
+                cur.execute("""
+                    CREATE UNIQUE INDEX IF NOT EXISTS idx_render_jobs_inflight_fingerprint
+                    ON render_jobs(fingerprint) WHERE status IN ('queued', 'running')
+                """)
                 
                 conn.commit()
     
@@ -351,6 +430,337 @@ class Database:
                 
                 conn.commit()
                 return cur.rowcount > 0
+    
+    # Render job queue methods
+    def create_render_job(self, user_id: str, params: Dict[str, Any], lane: str = 'credit',
+                          priority: int = 0, fingerprint: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Enqueue a render job for the worker pool in the given priority lane
+        If an identical job (same fingerprint) is already queued or running, that job is returned,
+        raised to this lane first if it is still queued at a lower priority
+        """
+        job_id = str(uuid.uuid4())
+        
+        with self.get_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                # Each statement sees its own snapshot: if the conflicting job finishes between
+                # the INSERT and the lookups, nothing is found and the INSERT is retried
+                result = None
+                while result is None:
+                    cur.execute("""
+                        INSERT INTO render_jobs (id, user_id, params, status, lane, priority, fingerprint)
+                        VALUES (%s, %s, %s, 'queued', %s, %s, %s)
+                        ON CONFLICT (fingerprint) WHERE status IN ('queued', 'running') DO NOTHING
+                        RETURNING *
+                    """, (job_id, user_id, Json(params), lane, priority, fingerprint))
+                    result = cur.fetchone()
+                    
+                    if result is None:
+                        # Joining a still-queued job from a higher lane lifts it to that lane
+                        cur.execute("""
+                            UPDATE render_jobs SET lane = %s, priority = %s
+                            WHERE fingerprint = %s AND status = 'queued' AND priority < %s
+                            RETURNING *
+                        """, (lane, priority, fingerprint, priority))
+                        result = cur.fetchone()
+                    
+                    if result is None:
+                        cur.execute("""
+                            SELECT * FROM render_jobs
+                            WHERE fingerprint = %s AND status IN ('queued', 'running')
+                        """, (fingerprint,))
+                        result = cur.fetchone()
+                
+                conn.commit()
+                return dict(result)
+    
+    def find_reusable_render_job(self, fingerprint: str, window_seconds: int) -> Optional[Dict[str, Any]]:
+        """Get the latest completed render with this fingerprint finished within the window"""
+        with self.get_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute("""
+                    SELECT * FROM render_jobs
+                    WHERE fingerprint = %s AND status = 'completed'
+                      AND completed_at > CURRENT_TIMESTAMP - (%s * INTERVAL '1 second')
+                    ORDER BY completed_at DESC
+                    LIMIT 1
+                """, (fingerprint, window_seconds))
+                
+                result = cur.fetchone()
+                return dict(result) if result else None
+    
+    def get_render_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get render job by ID"""
+        with self.get_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute("""
+                    SELECT * FROM render_jobs WHERE id = %s
+                """, (job_id,))
+                
+                result = cur.fetchone()
+                return dict(result) if result else None
+    
+    def claim_render_job(self, worker_id: str, lane_order: Optional[List[str]] = None,
+                         max_wait_seconds: int = 300) -> Optional[Dict[str, Any]]:
+        """
+        Atomically claim the next queued render job for a worker
+        Jobs waiting longer than max_wait_seconds go first, then lanes in lane_order,
+        oldest first within a lane. SKIP LOCKED lets many workers poll without blocking.
+        """
+        lane_order = lane_order or ['credit', 'trial']
+        
+        with self.get_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute("""
+                    UPDATE render_jobs
+                    SET status = 'running', worker_id = %s, attempts = attempts + 1,
+                        claimed_at = CURRENT_TIMESTAMP, heartbeat_at = CURRENT_TIMESTAMP, progress = NULL
+                    WHERE id = (
+                        SELECT id FROM render_jobs
+                        WHERE status = 'queued'
+                        ORDER BY
+                            created_at < CURRENT_TIMESTAMP - (%s * INTERVAL '1 second') DESC,
+                            COALESCE(array_position(%s::text[], lane::text), 2147483647),
+                            created_at
+                        FOR UPDATE SKIP LOCKED
+                        LIMIT 1
+                    )
+                    RETURNING *
+                """, (worker_id, max_wait_seconds, lane_order))
+                
+                conn.commit()
+                result = cur.fetchone()
+                return dict(result) if result else None
+    
+    def heartbeat_render_job(self, job_id: str, worker_id: str) -> bool:
+        """Refresh a running job's heartbeat; False if the worker no longer owns it"""
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    UPDATE render_jobs SET heartbeat_at = CURRENT_TIMESTAMP
+                    WHERE id = %s AND worker_id = %s AND status = 'running'
+                """, (job_id, worker_id))
+                
+                conn.commit()
+                return cur.rowcount > 0
+    
+    def complete_render_job(self, job_id: str, worker_id: str, output_path: str) -> bool:
+        """Mark a render job as completed with its output path"""
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    UPDATE render_jobs
+                    SET status = 'completed', output_path = %s, error = NULL, completed_at = CURRENT_TIMESTAMP
+                    WHERE id = %s AND worker_id = %s AND status = 'running'
+                """, (output_path, job_id, worker_id))
+                
+                updated = cur.rowcount > 0
+                if updated:
+                    self._notify_render_job(cur, job_id, {
+                        'status': 'completed', 'stage': 'completed', 'percent': 100, 'message': "Video ready"
+                    })
+                conn.commit()
+                return updated
+    
+    def fail_render_job(self, job_id: str, worker_id: str, error: str) -> bool:
+        """Mark a render job as failed"""
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    UPDATE render_jobs
+                    SET status = 'failed', error = %s, completed_at = CURRENT_TIMESTAMP
+                    WHERE id = %s AND worker_id = %s AND status = 'running'
+                """, (error, job_id, worker_id))
+                
+                updated = cur.rowcount > 0
+                if updated:
+                    self._notify_render_job(cur, job_id, {'status': 'failed', 'stage': 'failed', 'message': error})
+                conn.commit()
+                return updated
+    
+    def request_render_job_cancel(self, job_id: str) -> Optional[str]:
+        """
+        Cancel a render job
+        Queued jobs are cancelled immediately; running jobs are flagged for their worker
+        
+        Returns:
+            The job's resulting status, or None if the job is already finished
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    UPDATE render_jobs
+                    SET status = CASE WHEN status = 'queued' THEN 'cancelled' ELSE status END,
+                        completed_at = CASE WHEN status = 'queued' THEN CURRENT_TIMESTAMP ELSE completed_at END,
+                        cancel_requested = TRUE
+                    WHERE id = %s AND status IN ('queued', 'running')
+                    RETURNING status
+                """, (job_id,))
+                
+                result = cur.fetchone()
+                if result and result[0] == 'cancelled':
+                    self._notify_render_job(cur, job_id, {'status': 'cancelled', 'stage': 'cancelled'})
+                conn.commit()
+                return result[0] if result else None
+    
+    def is_render_job_cancel_requested(self, job_id: str) -> bool:
+        """Check whether cancellation was requested for a job"""
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT cancel_requested FROM render_jobs WHERE id = %s
+                """, (job_id,))
+                
+                result = cur.fetchone()
+                return bool(result and result[0])
+    
+    def mark_render_job_cancelled(self, job_id: str, worker_id: str) -> bool:
+        """Record that a worker stopped a running job after cancellation"""
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    UPDATE render_jobs
+                    SET status = 'cancelled', completed_at = CURRENT_TIMESTAMP
+                    WHERE id = %s AND worker_id = %s AND status = 'running'
+                """, (job_id, worker_id))
+                
+                updated = cur.rowcount > 0
+                if updated:
+                    self._notify_render_job(cur, job_id, {'status': 'cancelled', 'stage': 'cancelled'})
+                conn.commit()
+                return updated
+    
+    def _notify_render_job(self, cur, job_id: str, event: Dict[str, Any]):
+        """Queue a progress event on the job's channel (delivered when the transaction commits)"""
+        event = dict(event, job_id=job_id)
+        if event.get('message'):
+            # NOTIFY payloads are limited to 8000 bytes
+            event['message'] = str(event['message'])[:1000]
+        cur.execute("SELECT pg_notify(%s, %s)", (render_job_channel(job_id), json.dumps(event)))
+    
+    def publish_render_job_progress(self, job_id: str, worker_id: str, stage: str, percent: int,
+                                    message: str, eta_seconds: Optional[int] = None) -> bool:
+        """
+        Store a running job's latest progress and NOTIFY listeners on its channel
+        
+        Returns:
+            False if the worker no longer owns the job
+        """
+        event = {
+            'status': 'running',
+            'stage': stage,
+            'percent': percent,
+            'message': message,
+            'eta_seconds': eta_seconds
+        }
+        
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    UPDATE render_jobs SET progress = %s, progress_at = CURRENT_TIMESTAMP
+                    WHERE id = %s AND worker_id = %s AND status = 'running'
+                """, (Json(event), job_id, worker_id))
+                
+                updated = cur.rowcount > 0
+                if updated:
+                    self._notify_render_job(cur, job_id, event)
+                conn.commit()
+                return updated
+    
+    def listen_render_job_progress(self, job_id: str, timeout: float = 5.0) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        Follow a render job's progress events from any process
+        
+        Yields each event as it is published, and None once LISTEN is in place and after
+        every quiet timeout; on None callers should re-read the job row (get_render_job)
+        so nothing published before subscribing, or lost with a dropped connection, is missed.
+        Closing the generator closes its connection.
+        """
+        conn = self.get_connection()
+        try:
+            conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cur:
+                cur.execute(f'LISTEN "{render_job_channel(job_id)}"')
+            yield None
+            
+            while True:
+                if not select.select([conn], [], [], timeout)[0]:
+                    yield None
+                    continue
+                
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    try:
+                        yield json.loads(notify.payload)
+                    except ValueError:
+                        continue
+        finally:
+            conn.close()
+    
+    def get_clip_search(self, key: str, max_age_seconds: int) -> Optional[Any]:
+        """Get a cached search response stored within max_age_seconds"""
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT response FROM clip_search_cache
+                    WHERE key = %s AND created_at > CURRENT_TIMESTAMP - (%s * INTERVAL '1 second')
+                """, (key, max_age_seconds))
+                
+                result = cur.fetchone()
+                return result[0] if result else None
+    
+    def put_clip_search(self, key: str, query: str, response: Any):
+        """Store (or refresh) a search response"""
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO clip_search_cache (key, query, response, created_at)
+                    VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
+                    ON CONFLICT (key) DO UPDATE
+                    SET query = EXCLUDED.query, response = EXCLUDED.response, created_at = CURRENT_TIMESTAMP
+                """, (key, query, Json(response)))
+                conn.commit()
+    
+    def purge_clip_searches(self, max_age_seconds: int) -> int:
+        """Delete cached search responses older than max_age_seconds"""
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    DELETE FROM clip_search_cache
+                    WHERE created_at < CURRENT_TIMESTAMP - (%s * INTERVAL '1 second')
+                """, (max_age_seconds,))
+                conn.commit()
+                return cur.rowcount
+    
+    def reclaim_stale_render_jobs(self, stale_seconds: int, max_attempts: int) -> int:
+        """
+        Return jobs whose worker stopped heartbeating to the queue
+        Jobs that already used up their attempts are failed instead of retried, and jobs
+        cancelled while running are finished as cancelled
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    UPDATE render_jobs
+                    SET status = CASE WHEN cancel_requested THEN 'cancelled'
+                                      WHEN attempts >= %s THEN 'failed' ELSE 'queued' END,
+                        error = CASE WHEN NOT cancel_requested AND attempts >= %s
+                                     THEN 'Worker stopped responding' ELSE error END,
+                        completed_at = CASE WHEN cancel_requested OR attempts >= %s
+                                            THEN CURRENT_TIMESTAMP ELSE NULL END,
+                        worker_id = NULL
+                    WHERE status = 'running'
+                      AND heartbeat_at < CURRENT_TIMESTAMP - (%s * INTERVAL '1 second')
+                    RETURNING id, status
+                """, (max_attempts, max_attempts, max_attempts, stale_seconds))
+                
+                reclaimed = cur.fetchall()
+                for job_id, status in reclaimed:
+                    if status in RENDER_JOB_TERMINAL_STATES:
+                        self._notify_render_job(cur, job_id, {'status': status, 'stage': status})
+                conn.commit()
+                return len(reclaimed)
 
 
 # Global database instance
@@ -3,5 +3,6 @@ NanoTik Models Package
 """
 
 from .user import UserSession
+from .timeline import Timeline, Segment, AudioTrack, SubtitleItem, ClipProbe
 
-__all__ = ['UserSession']
+__all__ = ['UserSession', 'Timeline', 'Segment', 'AudioTrack', 'SubtitleItem', 'ClipProbe']
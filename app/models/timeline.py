@@ -0,0 +1,208 @@
+"""
+Composition timeline models
+A compact, serializable edit decision list of a render: video segments, audio tracks and
+subtitle cues. Any render engine can consume it, and it can be cached, compared and replayed.
+"""
+
+import json
+import hashlib
+from typing import List, Dict, Any, Optional
+
+
+class _Record:
+    """Base for slotted timeline records: dict round-trip, equality and repr from __slots__"""
+    __slots__ = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]):
+        return cls(**{name: data[name] for name in cls.__slots__ if name in data})
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class SubtitleItem(_Record):
+    """Represents a single subtitle item with timing"""
+    __slots__ = ('start', 'end', 'text')
+
+    def __init__(self, start: float, end: float, text: str):
+        self.start = start
+        self.end = end
+        self.text = text
+
+    def __repr__(self):
+        return f"SubtitleItem({self.start:.2f}s - {self.end:.2f}s: '{self.text}')"
+
+
+class ClipProbe(_Record):
+    """Stream metadata of a source video, read without decoding it"""
+    __slots__ = ('duration', 'width', 'height', 'fps', 'codec', 'has_audio', 'keyframes')
+
+    def __init__(self, duration: float, width: int, height: int, fps: float, codec: str,
+                 has_audio: bool = False, keyframes: Optional[List[float]] = None):
+        """
+        Args:
+            duration: Container duration in seconds
+            width: Frame width
+            height: Frame height
+            fps: Frame rate
+            codec: Video codec name (e.g. 'h264')
+            has_audio: Whether the file has an audio stream
+            keyframes: Keyframe timestamps in seconds, ascending
+        """
+        self.duration = duration
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.codec = codec
+        self.has_audio = has_audio
+        self.keyframes = keyframes or []
+
+    def keyframe_before(self, seconds: float) -> float:
+        """Latest keyframe at or before a time (where a stream copy can start)"""
+        return max((k for k in self.keyframes if k <= seconds + 1e-3), default=0.0)
+
+
+class Segment(_Record):
+    """A stretch of one source video placed on the timeline (looped if the source is shorter)"""
+    __slots__ = ('source', 'start', 'duration', 'source_start', 'scene_index')
+
+    def __init__(self, source: str, start: float, duration: float, source_start: float = 0.0,
+                 scene_index: Optional[int] = None):
+        """
+        Args:
+            source: Path of the source video
+            start: Timeline position in seconds
+            duration: Seconds the segment occupies on the timeline
+            source_start: Offset into the source the segment starts at
+            scene_index: Script scene the segment illustrates, if known
+        """
+        self.source = source
+        self.start = start
+        self.duration = duration
+        self.source_start = source_start
+        self.scene_index = scene_index
+
+    @property
+    def end(self) -> float:
+        return self.start + self.duration
+
+
+class AudioTrack(_Record):
+    """An audio source mixed into the timeline"""
+    __slots__ = ('kind', 'source', 'start', 'duration', 'volume', 'loop')
+
+    def __init__(self, kind: str, source: Optional[str], start: float, duration: float,
+                 volume: float = 1.0, loop: bool = False):
+        """
+        Args:
+            kind: Track role ('voiceover' or 'music')
+            source: Path of the audio file, or None for audio held in memory
+            start: Timeline position in seconds
+            duration: Seconds the track plays for
+            volume: Gain applied to the track
+            loop: Whether a shorter source repeats to fill the duration
+        """
+        self.kind = kind
+        self.source = source
+        self.start = start
+        self.duration = duration
+        self.volume = volume
+        self.loop = loop
+
+
+class Timeline:
+    """Edit decision list of one render"""
+    __slots__ = ('width', 'height', 'fps', 'segments', 'audio_tracks', 'subtitles', 'subtitle_position', 'sources')
+
+    def __init__(self, width: int, height: int, fps: int = 24,
+                 segments: Optional[List[Segment]] = None,
+                 audio_tracks: Optional[List[AudioTrack]] = None,
+                 subtitles: Optional[List[SubtitleItem]] = None,
+                 subtitle_position: str = 'bottom',
+                 sources: Optional[Dict[str, ClipProbe]] = None):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.segments = segments or []
+        self.audio_tracks = audio_tracks or []
+        self.subtitles = subtitles or []
+        self.subtitle_position = subtitle_position
+        # Probed metadata of each segment source, by path
+        self.sources = sources or {}
+
+    @property
+    def duration(self) -> float:
+        return max((segment.end for segment in self.segments), default=0.0)
+
+    def append_segment(self, source: str, duration: float, scene_index: Optional[int] = None) -> Segment:
+        """Add a segment at the current end of the timeline"""
+        segment = Segment(source, self.duration, duration, scene_index=scene_index)
+        self.segments.append(segment)
+        return segment
+
+    def stream_copyable(self, segment: Segment) -> bool:
+        """
+        Whether a segment can be cut from its source without re-encoding: H.264 at the
+        timeline's size and frame rate, starting on a keyframe, and not looped
+        """
+        probe = self.sources.get(segment.source)
+        if probe is None:
+            return False
+        return (
+            probe.codec == 'h264'
+            and (probe.width, probe.height) == (self.width, self.height)
+            and abs(probe.fps - self.fps) < 0.01
+            and probe.keyframe_before(segment.source_start) >= segment.source_start - 1e-3
+            and segment.source_start + segment.duration <= probe.duration
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'width': self.width,
+            'height': self.height,
+            'fps': self.fps,
+            'segments': [segment.to_dict() for segment in self.segments],
+            'audio_tracks': [track.to_dict() for track in self.audio_tracks],
+            'subtitles': [subtitle.to_dict() for subtitle in self.subtitles],
+            'subtitle_position': self.subtitle_position,
+            'sources': {path: probe.to_dict() for path, probe in self.sources.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Timeline':
+        return cls(
+            data['width'],
+            data['height'],
+            data.get('fps', 24),
+            segments=[Segment.from_dict(segment) for segment in data.get('segments', [])],
+            audio_tracks=[AudioTrack.from_dict(track) for track in data.get('audio_tracks', [])],
+            subtitles=[SubtitleItem.from_dict(subtitle) for subtitle in data.get('subtitles', [])],
+            subtitle_position=data.get('subtitle_position', 'bottom'),
+            sources={path: ClipProbe.from_dict(probe) for path, probe in data.get('sources', {}).items()}
+        )
+
+    def fingerprint(self) -> str:
+        """Digest of the timeline; equal timelines render identical videos"""
+        payload = json.dumps(self.to_dict(), sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def diff(self, other: 'Timeline') -> List[str]:
+        """Names of the parts that differ from another timeline (empty when equal)"""
+        mine, theirs = self.to_dict(), other.to_dict()
+        return [key for key in mine if mine[key] != theirs.get(key)]
+
+    def __eq__(self, other):
+        return isinstance(other, Timeline) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return (f"Timeline({self.width}x{self.height}@{self.fps}, {self.duration:.2f}s, "
+                f"{len(self.segments)} segments, {len(self.audio_tracks)} audio tracks, "
+                f"{len(self.subtitles)} subtitles)")
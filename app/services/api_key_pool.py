@@ -0,0 +1,164 @@
+"""
+API Key Pool for rate-limited stock footage APIs
+Routes each request to the key with the most rate-limit headroom (from the provider's
+X-Ratelimit-* response headers) and quarantines keys that hit 429 until their window resets
+"""
+
+import time
+import threading
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Quarantine for a 429 response without a usable reset header
+DEFAULT_QUARANTINE = 60
+
+
+class ApiKeysExhausted(Exception):
+    """Raised when every key in a pool is quarantined"""
+    def __init__(self, provider: str, retry_after: float):
+        super().__init__(f"All {provider} API keys are rate limited; retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class _KeyState:
+    """Rate-limit state and usage counters of one key"""
+    def __init__(self, key: str):
+        self.key = key
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self.quarantined_until = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.throttled = 0
+
+
+class ApiKeyPool:
+    """Pool of API keys for one provider, picked by rate-limit headroom"""
+
+    def __init__(self, provider: str, keys: List[str]):
+        """
+        Initialize key pool
+
+        Args:
+            provider: Provider name (for logs and errors)
+            keys: API keys (blank entries are ignored)
+        """
+        self.provider = provider
+        self._lock = threading.Lock()
+        self._keys = [_KeyState(key.strip()) for key in keys if key and key.strip()]
+        if not self._keys:
+            raise ValueError(f"No {provider} API keys configured")
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _headroom(self, state: _KeyState, now: float) -> float:
+        """Requests the key can still make in its window, net of requests in flight"""
+        if state.remaining is None or (state.reset_at is not None and now >= state.reset_at):
+            # Unknown or reset window: as good as a fresh key
+            remaining = state.limit if state.limit is not None else float('inf')
+        else:
+            remaining = state.remaining
+        return remaining - state.in_flight
+
+    def acquire(self) -> str:
+        """
+        Take the key with the most headroom for one request (release it afterwards)
+
+        Raises:
+            ApiKeysExhausted: If every key is quarantined
+        """
+        with self._lock:
+            now = time.time()
+            available = [state for state in self._keys if state.quarantined_until <= now]
+            if not available:
+                retry_after = min(state.quarantined_until for state in self._keys) - now
+                raise ApiKeysExhausted(self.provider, retry_after)
+
+            # Ties go to the least used key so load spreads evenly
+            state = max(available, key=lambda s: (self._headroom(s, now), -s.requests))
+            state.in_flight += 1
+            state.requests += 1
+            return state.key
+
+    def release(self, key: str, status_code: Optional[int] = None, headers: Optional[Dict[str, str]] = None):
+        """
+        Return a key and record the rate-limit state its response reported
+
+        Args:
+            key: Key returned by acquire
+            status_code: HTTP status of the response (None if the request failed without one)
+            headers: Response headers
+        """
+        with self._lock:
+            state = next(s for s in self._keys if s.key == key)
+            state.in_flight -= 1
+
+            headers = headers or {}
+            limit = _int_header(headers, 'X-Ratelimit-Limit')
+            remaining = _int_header(headers, 'X-Ratelimit-Remaining')
+            reset = _int_header(headers, 'X-Ratelimit-Reset')
+            if limit is not None:
+                state.limit = limit
+            if remaining is not None:
+                state.remaining = remaining
+            if reset is not None:
+                state.reset_at = _reset_time(reset)
+
+            if status_code == 429 or (remaining == 0 and status_code is not None):
+                now = time.time()
+                if status_code == 429:
+                    state.throttled += 1
+                state.quarantined_until = state.reset_at if state.reset_at and state.reset_at > now else now + DEFAULT_QUARANTINE
+                logger.warning(
+                    f"{self.provider} key {_mask(key)} rate limited; quarantined for "
+                    f"{state.quarantined_until - now:.0f}s"
+                )
+
+    def usage(self) -> List[Dict[str, Any]]:
+        """Per-key usage and rate-limit state (keys masked)"""
+        with self._lock:
+            now = time.time()
+            return [{
+                'key': _mask(state.key),
+                'requests': state.requests,
+                'throttled': state.throttled,
+                'in_flight': state.in_flight,
+                'limit': state.limit,
+                'remaining': state.remaining,
+                'reset_in': round(state.reset_at - now) if state.reset_at else None,
+                'quarantined': state.quarantined_until > now
+            } for state in self._keys]
+
+
+def _int_header(headers: Dict[str, str], name: str) -> Optional[int]:
+    value = headers.get(name)
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _reset_time(reset: int) -> float:
+    """Reset header as epoch seconds (providers send either an epoch time or seconds until reset)"""
+    return float(reset) if reset > 1000000000 else time.time() + reset
+
+
+def _mask(key: str) -> str:
+    return f"{key[:4]}…" if len(key) > 4 else '…'
+
+
+# Global pools, one per provider and key set (shared by every search in the process)
+_pools: Dict[Tuple[str, Tuple[str, ...]], ApiKeyPool] = {}
+_pools_lock = threading.Lock()
+
+def get_api_key_pool(provider: str, keys: List[str]) -> ApiKeyPool:
+    """Get or create the key pool for a provider's keys"""
+    with _pools_lock:
+        pool_key = (provider, tuple(keys))
+        if pool_key not in _pools:
+            _pools[pool_key] = ApiKeyPool(provider, keys)
+        return _pools[pool_key]
@@ -0,0 +1,253 @@
+"""
+Clip Library for offline clip matching
+Local stock clips with tags and descriptions, matched to scene descriptions through an
+inverted keyword index with TF-IDF weights; searched before the remote providers
+"""
+
+import os
+import json
+import math
+import random
+import shutil
+import hashlib
+import threading
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from .clip_search_cache import canonical_query
+
+logger = logging.getLogger(__name__)
+
+# A tag counts this many times a description word does
+TAG_WEIGHT = 2
+
+
+def keywords(text: str) -> List[str]:
+    """Search keywords of a text (same normalization as the search cache)"""
+    return canonical_query(text).split()
+
+
+class ClipLibrary:
+    """Local clip library: clip files plus an index.json of their metadata"""
+
+    def __init__(self, library_dir: str, min_score: float = 0.5):
+        """
+        Initialize clip library
+
+        Args:
+            library_dir: Directory holding clips/ and index.json
+            min_score: Share of a query's keyword weight (IDF) a clip must match to be used
+        """
+        self.library_dir = Path(library_dir)
+        self.clips_dir = self.library_dir / 'clips'
+        self.index_path = self.library_dir / 'index.json'
+        self.lock_path = self.library_dir / 'index.lock'
+        self.min_score = min_score
+        self._lock = threading.Lock()
+        self._index_mtime = None
+        self._clips: List[Dict[str, Any]] = []
+        self._postings: Dict[str, tuple] = {}
+        self._idf: Dict[str, float] = {}
+        self.clips_dir.mkdir(parents=True, exist_ok=True)
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._clips)
+
+    def _refresh(self):
+        """(Re)build the in-memory index when index.json changed (e.g. after an ingest)"""
+        try:
+            mtime = self.index_path.stat().st_mtime
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._index_mtime:
+            return
+
+        clips = []
+        if mtime is not None:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                clips = json.load(f).get('clips', [])
+
+        # term -> (clip ids, normalized term weights)
+        postings: Dict[str, List] = {}
+        for position, clip in enumerate(clips):
+            counts = Counter(keywords(clip.get('description', '')))
+            for tag in clip.get('tags', []):
+                for word in keywords(tag):
+                    counts[word] += TAG_WEIGHT
+            total = sum(counts.values()) or 1
+            for term, count in counts.items():
+                postings.setdefault(term, []).append((position, count / total))
+
+        self._clips = clips
+        self._postings = {
+            term: (np.array([p for p, _ in entries]), np.array([w for _, w in entries]))
+            for term, entries in postings.items()
+        }
+        self._idf = {term: math.log(1 + len(clips) / len(entries)) for term, entries in postings.items()}
+        self._index_mtime = mtime
+        logger.info(f"Clip library loaded: {len(clips)} clips, {len(postings)} terms")
+
+    def search(self, query: str, limit: int = 3) -> List[Dict[str, Any]]:
+        """
+        Best matching clips for a query
+
+        Returns:
+            Up to limit clip records, best first, each matching at least min_score of the
+            query's keyword weight
+        """
+        return [clip for clip, _ in self._ranked(query, limit)]
+
+    def _ranked(self, query: str, limit: int) -> List[Tuple[Dict[str, Any], Tuple[float, float]]]:
+        """Best matching clips with their (coverage, score) rank, best first"""
+        with self._lock:
+            self._refresh()
+            terms = [term for term in set(keywords(query)) if term in self._postings]
+            if not self._clips or not terms:
+                return []
+
+            query_weight = sum(self._idf.get(term, math.log(1 + len(self._clips))) for term in set(keywords(query)))
+            scores = np.zeros(len(self._clips))
+            coverage = np.zeros(len(self._clips))
+            for term in terms:
+                positions, weights = self._postings[term]
+                scores[positions] += self._idf[term] * weights
+                coverage[positions] += self._idf[term]
+
+            eligible = np.flatnonzero(coverage / query_weight >= self.min_score)
+            ranked = eligible[np.lexsort((-scores[eligible], -coverage[eligible]))][:limit]
+            return [
+                (self._clips[position], (round(float(coverage[position]), 9), round(float(scores[position]), 9)))
+                for position in ranked
+            ]
+
+    def find_clip(self, query: str, idx: int, seed: int = None) -> Optional[Dict[str, Any]]:
+        """
+        Clip metadata (as search_video_clips returns) for a scene, or None without a good match
+
+        The most relevant clip is used; with a seed, ties between equally relevant clips
+        are broken deterministically per scene.
+        """
+        matches = [(clip, rank) for clip, rank in self._ranked(query, 3) if (self.clips_dir / clip['file']).exists()]
+        if not matches:
+            return None
+        best = [clip for clip, rank in matches if rank == matches[0][1]]
+        record = random.Random(f"{seed}:{idx}").choice(best) if seed is not None else best[0]
+
+        path = self.clips_dir / record['file']
+        return {
+            'id': f"library_{record['id']}",
+            'url': str(path.absolute()),
+            'local_path': str(path.absolute()),
+            'description': query,
+            'duration': record.get('duration', 5),
+            'width': record.get('width', 1920),
+            'height': record.get('height', 1080),
+            'source': 'library',
+            'scene_index': idx
+        }
+
+    def ingest(self, source_path: str, tags: List[str], description: str = '',
+               metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Copy a clip into the library and index it (re-ingesting a clip updates its tags)
+
+        Args:
+            source_path: Video file to add
+            tags: Keywords describing the footage
+            description: Free-text description (also indexed)
+            metadata: Optional duration, width and height of the clip
+
+        Returns:
+            The clip's index record
+        """
+        source = Path(source_path)
+        digest = hashlib.sha256()
+        with open(source, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        clip_id = digest.hexdigest()[:16]
+        file_name = f"{clip_id}{source.suffix.lower() or '.mp4'}"
+
+        target = self.clips_dir / file_name
+        if not target.exists():
+            partial_path = target.with_name(f"{target.name}.{os.urandom(4).hex()}.part")
+            try:
+                shutil.copyfile(source, partial_path)
+                os.replace(partial_path, target)
+            finally:
+                if partial_path.exists():
+                    partial_path.unlink()
+
+        record = {
+            'id': clip_id,
+            'file': file_name,
+            'tags': sorted({tag.strip().lower() for tag in tags if tag.strip()}),
+            'description': description,
+            'original_name': source.name,
+            'ingested_at': datetime.now(timezone.utc).isoformat(),
+            **(metadata or {})
+        }
+
+        # The file lock also serializes other processes (ingest runs, workers) updating the index
+        with self._lock, self._index_lock():
+            clips = []
+            if self.index_path.exists():
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    clips = json.load(f).get('clips', [])
+            clips = [clip for clip in clips if clip['id'] != clip_id] + [record]
+
+            partial_path = self.index_path.with_name(f"index.json.{os.urandom(4).hex()}.part")
+            try:
+                with open(partial_path, 'w', encoding='utf-8') as f:
+                    json.dump({'clips': clips}, f, ensure_ascii=False, indent=2)
+                os.replace(partial_path, self.index_path)
+            finally:
+                if partial_path.exists():
+                    partial_path.unlink()
+
+        logger.info(f"Ingested {source.name} as {clip_id} ({', '.join(record['tags'])})")
+        return record
+
+    @contextmanager
+    def _index_lock(self):
+        """Exclusive lock on the index across processes (held for a read-modify-write)"""
+        with open(self.lock_path, 'a+') as lock_file:
+            if os.name == 'nt':
+                import msvcrt
+                # Lock the first byte; LK_LOCK gives up after ~10s, so keep retrying
+                lock_file.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+                try:
+                    yield
+                finally:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def get_clip_library(config: Dict[str, Any]) -> Optional[ClipLibrary]:
+    """Create the configured clip library (video.clip_library_dir; empty = disabled)"""
+    video_config = config.get('video', {})
+    library_dir = video_config.get('clip_library_dir', '')
+    if not library_dir:
+        return None
+    return ClipLibrary(library_dir, float(video_config.get('clip_library_min_score', 0.5)))
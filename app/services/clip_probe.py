@@ -0,0 +1,140 @@
+"""
+Clip Probe for source video metadata
+Reads duration, frame size, frame rate, codec, audio presence and the keyframe index of a
+clip from one demux pass of the bundled ffmpeg (no decoding), and keeps the result in a
+.probe.json sidecar next to cached and library clips so each file is probed once
+"""
+
+import os
+import re
+import json
+import subprocess
+import logging
+from pathlib import Path
+
+import imageio_ffmpeg
+
+from app.models.timeline import ClipProbe
+
+logger = logging.getLogger(__name__)
+
+# Bumped when the probe format changes, so older sidecars are re-probed
+PROBE_VERSION = 1
+
+_DURATION = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+_VIDEO_STREAM = re.compile(r"Stream #\d+:\d+.*?: Video: (\w+).*?, (\d{2,5})x(\d{2,5})")
+_FPS = re.compile(r"(\d+(?:\.\d+)?)(k?) (?:fps|tbr)")
+_AUDIO_STREAM = re.compile(r"Stream #\d+:\d+.*?: Audio: ")
+_TIME_BASE = re.compile(r"^#tb 0: (\d+)/(\d+)", re.MULTILINE)
+
+
+def probe_clip(path: str) -> ClipProbe:
+    """
+    Probe a video file
+
+    The video stream is stream-copied to ffmpeg's framecrc muxer, which lists every
+    packet with its timestamp and key flag without decoding any frames.
+
+    Raises:
+        Exception: If the file can't be read or has no video stream
+    """
+    process = subprocess.run(
+        [imageio_ffmpeg.get_ffmpeg_exe(), '-hide_banner', '-nostats', '-i', str(path),
+         '-map', '0:v:0', '-c', 'copy', '-f', 'framecrc', '-'],
+        capture_output=True
+    )
+    header = process.stderr.decode(errors='replace')
+    packets = process.stdout.decode(errors='replace')
+
+    video_stream = _VIDEO_STREAM.search(header)
+    if process.returncode != 0 or not video_stream:
+        raise Exception(f"Failed to probe {path}: {header.strip().splitlines()[-1] if header.strip() else 'no output'}")
+
+    stream_line = header[video_stream.start():header.find('\n', video_stream.start())]
+    fps_match = _FPS.search(stream_line)
+    fps = float(fps_match.group(1)) * (1000 if fps_match.group(2) else 1) if fps_match else 0.0
+
+    # Packet lines: stream, dts, pts, duration, size, crc[, F=flags]; no flags means a keyframe
+    keyframes = []
+    last_end = 0.0
+    time_base = _TIME_BASE.search(packets)
+    if time_base:
+        tb = int(time_base.group(1)) / int(time_base.group(2))
+        for line in packets.splitlines():
+            if line.startswith('#'):
+                continue
+            fields = [field.strip() for field in line.split(',')]
+            if len(fields) < 6:
+                continue
+            pts, packet_duration = int(fields[2]), int(fields[3])
+            last_end = max(last_end, (pts + packet_duration) * tb)
+            flags = int(fields[6][2:], 16) if len(fields) > 6 and fields[6].startswith('F=') else 1
+            if flags & 1:
+                keyframes.append(round(pts * tb, 3))
+
+    duration_match = _DURATION.search(header)
+    if duration_match:
+        hours, minutes, seconds = duration_match.groups()
+        duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    else:
+        duration = last_end
+
+    return ClipProbe(
+        duration=round(duration, 3),
+        width=int(video_stream.group(2)),
+        height=int(video_stream.group(3)),
+        fps=fps,
+        codec=video_stream.group(1),
+        has_audio=bool(_AUDIO_STREAM.search(header)),
+        keyframes=sorted(set(keyframes))
+    )
+
+
+def probe_path(path: Path) -> Path:
+    """Sidecar file holding a clip's probe"""
+    return path.with_name(f"{path.name}.probe.json")
+
+
+def cached_probe(path: str, persist: bool = True) -> ClipProbe:
+    """
+    Probe a clip, reusing its .probe.json sidecar when the file hasn't changed since
+
+    Args:
+        path: Video file
+        persist: Write the sidecar after probing (off for temporary clips)
+
+    Raises:
+        Exception: If the file can't be probed
+    """
+    path = Path(path)
+    stat = path.stat()
+    sidecar = probe_path(path)
+    try:
+        with open(sidecar, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if (data.get('version') == PROBE_VERSION and data.get('size') == stat.st_size
+                and data.get('mtime') == stat.st_mtime):
+            return ClipProbe.from_dict(data['probe'])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    probe = probe_clip(str(path))
+    if persist:
+        _write_sidecar(sidecar, {'version': PROBE_VERSION, 'size': stat.st_size, 'mtime': stat.st_mtime,
+                                 'probe': probe.to_dict()})
+    return probe
+
+
+def _write_sidecar(sidecar: Path, data: dict):
+    # Write to a private file first so concurrent renders never read a partial sidecar
+    partial_path = sidecar.with_name(f"{sidecar.name}.{os.urandom(4).hex()}.part")
+    try:
+        with open(partial_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(partial_path, sidecar)
+    except OSError as e:
+        # A read-only cache only costs a re-probe next time
+        logger.warning(f"Failed to save clip probe {sidecar}: {e}")
+    finally:
+        if partial_path.exists():
+            partial_path.unlink()
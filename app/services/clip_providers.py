@@ -0,0 +1,179 @@
+"""
+Clip Providers for stock footage search
+Pexels and Pixabay behind one interface: search returns video results in one shape,
+with API key rotation (ApiKeyPool) and the shared search cache applied to every provider
+"""
+
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, Any, List, Optional
+
+import requests
+
+from .api_key_pool import ApiKeyPool, get_api_key_pool
+from .clip_search_cache import ClipSearchCache, search_cache_key
+
+logger = logging.getLogger(__name__)
+
+
+class ClipProvider(ABC):
+    """
+    Interface every stock footage provider implements
+
+    Results are dicts with 'id', 'duration' and 'video_files'; each file has
+    'link', 'width', 'height' and 'quality' ('hd' or 'sd').
+    """
+
+    name = ''
+
+    def __init__(self, session: requests.Session, key_pool: ApiKeyPool,
+                 search_cache: Optional[ClipSearchCache] = None, per_page: int = 3):
+        """
+        Args:
+            session: Shared keep-alive HTTP session
+            key_pool: The provider's API keys
+            search_cache: Optional search response cache
+            per_page: Results requested per search
+        """
+        self.session = session
+        self.key_pool = key_pool
+        self.search_cache = search_cache
+        self.per_page = per_page
+
+    def search(self, query: str, cache_lookups: Optional[List[bool]] = None) -> List[Dict[str, Any]]:
+        """
+        Search videos, served from the search cache for repeat and near-identical queries
+
+        Each request uses the key with the most rate-limit headroom; a 429 quarantines
+        that key and the request moves on to the next one.
+
+        Args:
+            query: Search text
+            cache_lookups: Optional list the search cache outcome is appended to (True = hit),
+                for per-job hit/miss counts
+
+        Raises:
+            Exception: If the search fails
+        """
+        cache_key = search_cache_key(self.name, query, self._options())
+        if self.search_cache:
+            videos = self.search_cache.get(cache_key)
+            if cache_lookups is not None:
+                cache_lookups.append(videos is not None)
+            if videos is not None:
+                return videos
+
+        for _ in range(len(self.key_pool)):
+            api_key = self.key_pool.acquire()
+            response = None
+            try:
+                response = self._request(api_key, query)
+            finally:
+                self.key_pool.release(
+                    api_key,
+                    response.status_code if response is not None else None,
+                    response.headers if response is not None else None
+                )
+            if response.status_code != 429:
+                break
+        response.raise_for_status()
+
+        videos = self._parse(response.json())
+        if self.search_cache:
+            self.search_cache.put(cache_key, query, videos)
+        return videos
+
+    def _options(self) -> Dict[str, Any]:
+        """Search options that change the results (part of the cache key)"""
+        return {'per_page': self.per_page}
+
+    @abstractmethod
+    def _request(self, api_key: str, query: str) -> requests.Response:
+        """Send one search request with an API key"""
+
+    @abstractmethod
+    def _parse(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Convert the provider's response body to video results"""
+
+
+class PexelsProvider(ClipProvider):
+    """Pexels video search"""
+
+    name = 'pexels'
+    URL = "https://api.pexels.com/videos/search"
+
+    def _options(self) -> Dict[str, Any]:
+        return {'per_page': self.per_page, 'orientation': 'landscape'}
+
+    def _request(self, api_key: str, query: str) -> requests.Response:
+        params = {
+            'query': query,
+            'per_page': self.per_page,
+            'page': 1,
+            'orientation': 'landscape'
+        }
+        return self.session.get(self.URL, headers={'Authorization': api_key}, params=params, timeout=10)
+
+    def _parse(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # Keep only what clip selection reads
+        return [
+            {'id': video.get('id'), 'duration': video.get('duration', 5), 'video_files': video.get('video_files', [])}
+            for video in data.get('videos', [])
+        ]
+
+
+class PixabayProvider(ClipProvider):
+    """Pixabay video search"""
+
+    name = 'pixabay'
+    URL = "https://pixabay.com/api/videos/"
+
+    def _request(self, api_key: str, query: str) -> requests.Response:
+        params = {
+            'key': api_key,
+            'q': query[:100],  # Pixabay rejects longer queries
+            'per_page': max(self.per_page, 3),  # Pixabay minimum
+            'safesearch': 'true'
+        }
+        return self.session.get(self.URL, params=params, timeout=10)
+
+    def _parse(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        videos = []
+        for hit in data.get('hits', [])[:self.per_page]:
+            video_files = [
+                {
+                    'link': rendition.get('url', ''),
+                    'width': rendition.get('width', 0),
+                    'height': rendition.get('height', 0),
+                    'quality': 'hd' if rendition.get('width', 0) >= 1280 else 'sd'
+                }
+                for rendition in (hit.get('videos') or {}).values()
+                if rendition.get('url')
+            ]
+            videos.append({'id': f"pixabay_{hit.get('id')}", 'duration': hit.get('duration', 5), 'video_files': video_files})
+        return videos
+
+
+PROVIDERS = {
+    'pexels': (PexelsProvider, 'pexels_api_keys'),
+    'pixabay': (PixabayProvider, 'pixabay_api_keys')
+}
+
+
+def get_clip_providers(config: Dict[str, Any], session: requests.Session,
+                       search_cache: Optional[ClipSearchCache] = None) -> List[ClipProvider]:
+    """
+    Create the providers that have API keys, in video.clip_providers priority order
+
+    Returns:
+        Providers, primary first (empty when none is configured)
+    """
+    providers = []
+    for name in config.get('video', {}).get('clip_providers', ['pexels', 'pixabay']):
+        if name not in PROVIDERS:
+            raise ValueError(f"Unknown clip provider: {name}")
+        provider_class, keys_setting = PROVIDERS[name]
+        keys = [key for key in config['app'].get(keys_setting, []) if key and key.strip()]
+        if keys:
+            providers.append(provider_class(session, get_api_key_pool(name, keys), search_cache))
+    return providers
@@ -0,0 +1,204 @@
+"""
+Clip Search Cache for stock footage searches
+Caches search responses by a canonical form of the query (lowercased keywords without
+stopwords, reduced to a base form, as a sorted set) plus the search options, with a TTL,
+in Postgres (shared by all replicas) or in a local directory
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+import logging
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Words that don't change what footage a search finds
+STOPWORDS = frozenset("""
+a an the and or but of in on at to for from with by as into onto over under about above below
+is are was were be been being am this that these those it its there here their his her our your
+my some any very just of off up down out showing shows shown scene shot footage video clip view
+""".split())
+
+
+def _base_form(word: str) -> str:
+    """Crude English lemma: strip plural, -ing and -ed endings (same reduction for every query)"""
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 4 and word.endswith(('sses', 'ches', 'shes', 'xes')):
+        return word[:-2]
+    if len(word) > 3 and word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        word = word[:-1]
+    for suffix in ('ing', 'ed'):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            word = word[:-len(suffix)]
+            # running -> runn -> run
+            if len(word) > 2 and word[-1] == word[-2] and word[-1] not in 'aeiouls':
+                word = word[:-1]
+            break
+    return word
+
+
+def canonical_query(query: str) -> str:
+    """
+    Canonical form of a search query, equal for near-identical scene descriptions
+
+    e.g. "Dogs running in the park" and "a dog runs in a park" -> "dog park run"
+    """
+    words = re.findall(r'\w+', (query or '').lower())
+    keywords = {_base_form(word) for word in words if word not in STOPWORDS} - STOPWORDS
+    return ' '.join(sorted(keywords))
+
+
+def search_cache_key(provider: str, query: str, options: Optional[Dict[str, Any]] = None) -> str:
+    """Cache key for a search: provider, canonical query and options (orientation, per_page, ...)"""
+    payload = json.dumps({
+        'provider': provider,
+        'query': canonical_query(query),
+        'options': options or {}
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ClipSearchCache(ABC):
+    """Search response cache with a TTL and hit/miss counters"""
+
+    def __init__(self, ttl: int = 86400):
+        """
+        Args:
+            ttl: Seconds a cached response is served for
+        """
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached response for key, or None when missing or expired"""
+        try:
+            response = self._load(key)
+        except Exception as e:
+            logger.warning(f"Clip search cache read failed: {e}")
+            response = None
+
+        with self._lock:
+            if response is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return response
+
+    def put(self, key: str, query: str, response: Any):
+        """Store a search response (failures are logged, never raised)"""
+        try:
+            self._store(key, query, response)
+        except Exception as e:
+            logger.warning(f"Clip search cache write failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hits, misses and hit rate since the cache was created (process-lifetime totals)"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0
+            }
+
+    @abstractmethod
+    def _load(self, key: str) -> Optional[Any]:
+        """Stored response for a key, or None when missing or expired"""
+
+    @abstractmethod
+    def _store(self, key: str, query: str, response: Any):
+        """Persist a response under a key"""
+
+    @abstractmethod
+    def purge(self) -> int:
+        """Delete expired responses; returns how many were removed"""
+
+
+class PostgresClipSearchCache(ClipSearchCache):
+    """Search cache in the clip_search_cache table, shared by every replica and worker"""
+
+    def __init__(self, db, ttl: int = 86400):
+        super().__init__(ttl)
+        self.db = db
+
+    def _load(self, key: str) -> Optional[Any]:
+        return self.db.get_clip_search(key, self.ttl)
+
+    def _store(self, key: str, query: str, response: Any):
+        self.db.put_clip_search(key, query, response)
+
+    def purge(self) -> int:
+        return self.db.purge_clip_searches(self.ttl)
+
+
+class FileClipSearchCache(ClipSearchCache):
+    """Search cache as JSON files in a local directory (entry age from file mtime)"""
+
+    def __init__(self, cache_dir: str, ttl: int = 86400):
+        super().__init__(ttl)
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _load(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl:
+                path.unlink(missing_ok=True)
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)['response']
+        except FileNotFoundError:
+            return None
+
+    def _store(self, key: str, query: str, response: Any):
+        path = self._path(key)
+        partial_path = path.with_name(f"{path.name}.{os.urandom(4).hex()}.part")
+        try:
+            with open(partial_path, 'w', encoding='utf-8') as f:
+                json.dump({'query': query, 'response': response}, f, ensure_ascii=False)
+            os.replace(partial_path, path)
+        finally:
+            if partial_path.exists():
+                partial_path.unlink()
+
+    def purge(self) -> int:
+        removed = 0
+        cutoff = time.time() - self.ttl
+        for path in self.cache_dir.glob('*.json'):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+
+def get_clip_search_cache(config: Dict[str, Any]) -> Optional[ClipSearchCache]:
+    """
+    Create the configured search cache (video.search_cache: "postgres", "file" or "" for none)
+    """
+    video_config = config.get('video', {})
+    backend = video_config.get('search_cache', '')
+    ttl = int(video_config.get('search_cache_ttl', 86400))
+
+    if backend == 'postgres':
+        from app.database import get_database
+        return PostgresClipSearchCache(get_database(), ttl)
+    if backend == 'file':
+        return FileClipSearchCache(video_config.get('search_cache_dir', './.cache/search'), ttl)
+    if backend:
+        raise ValueError(f"Unknown search cache: {backend}")
+    return None
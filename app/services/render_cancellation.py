@@ -0,0 +1,183 @@
+"""
+Render cancellation support
+Cooperative cancellation tokens checked between pipeline stages and on every encoded
+frame, plus termination of in-flight ffmpeg subprocesses
+"""
+
+import os
+import time
+import signal
+import threading
+import logging
+from typing import Callable, Iterable, Optional
+
+import proglog
+
+logger = logging.getLogger(__name__)
+
+
+class RenderCancelled(Exception):
+    """Raised inside a render once its cancellation token is cancelled"""
+    pass
+
+
+class CancellationToken:
+    """Thread-safe cancellation flag shared between a render and whoever may cancel it"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self.reason = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "Render cancelled"):
+        """Cancel the render and run registered cancel callbacks (once)"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks)
+
+        logger.info(f"Cancelling render: {reason}")
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Cancel callback failed: {e}")
+
+    def raise_if_cancelled(self):
+        """Raise RenderCancelled if the token has been cancelled"""
+        if self._event.is_set():
+            raise RenderCancelled(self.reason or "Render cancelled")
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Register a callback run when the token is cancelled
+
+        Returns:
+            Function that unregisters the callback
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+
+                def unregister():
+                    with self._lock:
+                        if callback in self._callbacks:
+                            self._callbacks.remove(callback)
+                return unregister
+
+        # Already cancelled: run immediately
+        callback()
+        return lambda: None
+
+
+def kill_ffmpeg_processes(paths: Iterable[str]) -> int:
+    """
+    Kill this process's ffmpeg children working on any of the given files
+
+    Args:
+        paths: Files private to the render (outputs, temp audio, temp clips); never
+            pass files other renders may read at the same time
+
+    Returns:
+        Number of processes killed (0 where /proc is unavailable)
+    """
+    paths = [str(p) for p in paths if p]
+    if not paths or not os.path.isdir('/proc'):
+        return 0
+
+    parent_pid = os.getpid()
+    killed = 0
+
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'r') as f:
+                # Field 4 is the parent PID; the command name may contain spaces, so split after ')'
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+            if ppid != parent_pid:
+                continue
+            with open(f'/proc/{entry}/cmdline', 'rb') as f:
+                cmdline = f.read().decode('utf-8', errors='ignore').replace('\x00', ' ')
+        except (OSError, ValueError, IndexError):
+            continue
+
+        if 'ffmpeg' in cmdline and any(path in cmdline for path in paths):
+            try:
+                os.kill(int(entry), signal.SIGKILL)
+                killed += 1
+            except OSError:
+                pass
+
+    if killed:
+        logger.info(f"Killed {killed} ffmpeg process(es)")
+    return killed
+
+
+def kill_clip_readers(clips: Iterable) -> int:
+    """
+    Kill the ffmpeg reader processes of MoviePy clips (video frames and audio)
+
+    Args:
+        clips: VideoFileClip/AudioFileClip objects opened by the render
+
+    Returns:
+        Number of processes killed
+    """
+    killed = 0
+    for clip in list(clips):
+        audio = getattr(clip, 'audio', None)
+        for reader in (getattr(clip, 'reader', None), getattr(audio, 'reader', None)):
+            proc = getattr(reader, 'proc', None)
+            if proc is None or proc.poll() is not None:
+                continue
+            try:
+                proc.kill()
+                killed += 1
+            except OSError:
+                pass
+
+    if killed:
+        logger.info(f"Killed {killed} clip reader(s)")
+    return killed
+
+
+class RenderProgressLogger(proglog.ProgressBarLogger):
+    """
+    MoviePy logger that checks for cancellation on every frame/audio chunk
+    and reports encode progress through the pipeline's progress callback
+    """
+
+    def __init__(self, cancel_token: Optional[CancellationToken] = None, progress_callback=None,
+                 start: int = 85, end: int = 99, min_interval: float = 1.0):
+        super().__init__()
+        self.cancel_token = cancel_token
+        self.progress_callback = progress_callback
+        self.start = start
+        self.end = end
+        self.min_interval = min_interval
+        self._last_report = 0.0
+
+    def bars_callback(self, bar, attr, value, old_value=None):
+        if self.cancel_token:
+            self.cancel_token.raise_if_cancelled()
+
+        if attr != 'index' or bar != 'frame_index' or not self.progress_callback:
+            return
+
+        total = self.bars[bar].get('total')
+        now = time.monotonic()
+        if not total or now - self._last_report < self.min_interval:
+            return
+
+        self._last_report = now
+        fraction = min(value / total, 1.0)
+        progress = self.start + int((self.end - self.start) * fraction)
+        self.progress_callback(progress, f"Encoding final video ({int(fraction * 100)}%)...")
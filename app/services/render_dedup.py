@@ -0,0 +1,162 @@
+"""
+Render deduplication for identical generation requests
+Fingerprints requests, coalesces identical in-flight renders (single-flight)
+and reuses recently completed renders
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+import logging
+from concurrent.futures import Future
+from typing import Dict, Any, List, Optional, Callable
+
+from .render_cancellation import RenderCancelled
+
+logger = logging.getLogger(__name__)
+
+# Parameters that determine the rendered output
+FINGERPRINT_FIELDS = [
+    'topic', 'custom_script', 'duration', 'voice', 'quality', 'aspect_ratio',
+    'language', 'clip_duration', 'align_scenes', 'subtitle_position'
+]
+
+
+def request_fingerprint(params: Dict[str, Any]) -> Optional[str]:
+    """
+    Canonical fingerprint of a generation request
+
+    Args:
+        params: Generation parameters
+
+    Returns:
+        Hex digest, or None when the request can't be shared (custom music upload)
+    """
+    if params.get('music_enabled') and params.get('music_path'):
+        return None
+
+    canonical = {}
+    for field in FINGERPRINT_FIELDS:
+        value = params.get(field)
+        if field == 'align_scenes':
+            value = bool(value)
+        if isinstance(value, str):
+            # Case and whitespace don't change the video
+            value = ' '.join(value.split())
+            if field == 'topic':
+                value = value.lower()
+        canonical[field] = value if value not in ('', None) else None
+
+    payload = json.dumps(canonical, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def fingerprint_seed(fingerprint: str) -> int:
+    """Deterministic RNG seed derived from a fingerprint"""
+    return int(fingerprint[:12], 16)
+
+
+class RenderDeduplicator:
+    """Single-flight execution plus a reuse window for completed renders"""
+
+    def __init__(self, reuse_window: float = 3600):
+        """
+        Initialize render deduplicator
+
+        Args:
+            reuse_window: Seconds a completed render may be served again (0 = no reuse)
+        """
+        self.reuse_window = reuse_window
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        # Lanes of the requests sharing each in-flight render (leader first)
+        self._lanes: Dict[str, List[str]] = {}
+        self._completed: Dict[str, tuple] = {}
+
+    def _reusable(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        entry = self._completed.get(fingerprint)
+        if not entry:
+            return None
+
+        completed_at, result = entry
+        if time.time() - completed_at > self.reuse_window or not os.path.exists(result['video_path']):
+            del self._completed[fingerprint]
+            return None
+        return result
+
+    def joined_lanes(self, fingerprint: Optional[str]) -> List[str]:
+        """Priority lanes of every request sharing the in-flight render of this fingerprint"""
+        with self._lock:
+            return list(self._lanes.get(fingerprint, []))
+
+    def run(self, fingerprint: Optional[str], render: Callable[[], Dict[str, Any]], on_wait=None,
+            lane: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Run a render, sharing the result with identical concurrent or recent requests
+
+        Args:
+            fingerprint: Request fingerprint (None = always render)
+            render: Function performing the render, returning a result dict with 'video_path'
+            on_wait: Optional callback() invoked when joining an in-flight render
+            lane: Priority lane of this request (see joined_lanes)
+
+        Returns:
+            Render result (marked with 'deduplicated': True when shared)
+        """
+        if not fingerprint:
+            return render()
+
+        while True:
+            with self._lock:
+                result = self._reusable(fingerprint)
+                if result:
+                    logger.info(f"Reusing completed render {fingerprint[:12]}: {result['video_path']}")
+                    return dict(result, deduplicated=True)
+
+                future = self._in_flight.get(fingerprint)
+                leader = future is None
+                if leader:
+                    future = Future()
+                    self._in_flight[fingerprint] = future
+                    self._lanes[fingerprint] = []
+                if lane:
+                    self._lanes[fingerprint].append(lane)
+
+            if leader:
+                break
+
+            logger.info(f"Joining in-flight render {fingerprint[:12]}")
+            if on_wait:
+                on_wait()
+            try:
+                return dict(future.result(), deduplicated=True)
+            except RenderCancelled:
+                # The leader's user cancelled; this request still wants the video
+                continue
+            except Exception:
+                raise
+            except BaseException:
+                # Leader aborted by its caller (e.g. web session closed); retry as leader
+                continue
+
+        try:
+            result = render()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[fingerprint]
+                del self._lanes[fingerprint]
+                if future.exception() is None and self.reuse_window > 0:
+                    now = time.time()
+                    self._completed = {
+                        key: entry for key, entry in self._completed.items()
+                        if now - entry[0] <= self.reuse_window
+                    }
+                    self._completed[fingerprint] = (now, future.result())
@@ -0,0 +1,379 @@
+"""
+Render Scheduler for host-level admission control
+Gives each render a CPU/memory cost and only admits renders while the host budget allows.
+Waiting renders are served from weighted priority lanes (credit, trial) with aging
+so lower lanes are never starved.
+"""
+
+import os
+import time
+import random
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+# Output pixel counts per quality tier (matches compose_video's target resolutions)
+QUALITY_PIXELS = {
+    'basic': 1280 * 720,
+    'hd': 1920 * 1080,
+    'premium': 1920 * 1080
+}
+
+# Encoder threads per quality tier
+QUALITY_THREADS = {
+    'basic': 2,
+    'hd': 3,
+    'premium': 4
+}
+
+# Seconds of wall time per second of output video on a reference host
+QUALITY_SPEED = {
+    'basic': 0.6,
+    'hd': 1.2,
+    'premium': 1.5
+}
+
+# Relative share of render capacity per priority lane
+LANE_WEIGHTS = {
+    'credit': 3,
+    'trial': 1
+}
+
+DEFAULT_LANE = 'credit'
+
+
+def determine_lane(has_free_trial: bool) -> str:
+    """
+    Pick the priority lane for a render from how it is paid for
+
+    Renders are settled either by the user's free trial or by deducting credits
+    (generate_video rejects anything else), so those are the two lanes.
+
+    Args:
+        has_free_trial: Whether the render is the user's free trial
+
+    Returns:
+        Lane name ('trial' or 'credit')
+    """
+    return 'trial' if has_free_trial else 'credit'
+
+
+def lane_claim_order(weights: Optional[Dict[str, int]] = None, rng=random) -> List[str]:
+    """
+    Weighted random lane ordering for stateless queue claims
+
+    Each claim prefers a lane with probability proportional to its weight, then falls
+    through the remaining lanes so workers never idle while any lane has work.
+    """
+    weights = dict(weights or LANE_WEIGHTS)
+    order = []
+    while weights:
+        lanes = list(weights)
+        lane = rng.choices(lanes, weights=[max(weights[l], 0.001) for l in lanes])[0]
+        order.append(lane)
+        del weights[lane]
+    return order
+
+
+class RenderCost:
+    """Resource cost of a single render"""
+    def __init__(self, threads: int, memory_mb: int, est_seconds: float):
+        self.threads = threads
+        self.memory_mb = memory_mb
+        self.est_seconds = est_seconds
+
+    def __repr__(self):
+        return f"RenderCost(threads={self.threads}, memory={self.memory_mb}MB, est={self.est_seconds:.0f}s)"
+
+
+def estimate_render_cost(quality: str, duration: float, aspect_ratio: str = '16:9') -> RenderCost:
+    """
+    Estimate the resources a render needs
+
+    Args:
+        quality: Video quality setting (basic, hd, premium)
+        duration: Target video duration in seconds
+        aspect_ratio: Output aspect ratio ('16:9' or '9:16')
+
+    Returns:
+        RenderCost for the job
+    """
+    pixels = QUALITY_PIXELS.get(quality, QUALITY_PIXELS['basic'])
+    megapixels = pixels / 1_000_000
+
+    # Portrait output rescales landscape stock footage on every frame
+    scale_factor = 1.2 if aspect_ratio == '9:16' else 1.0
+
+    # Decoders, composited RGB frames and subtitle overlays dominate memory
+    memory_mb = int((350 + megapixels * 250 + duration * 2) * scale_factor)
+    threads = QUALITY_THREADS.get(quality, QUALITY_THREADS['basic'])
+    est_seconds = duration * QUALITY_SPEED.get(quality, QUALITY_SPEED['basic']) * scale_factor
+
+    return RenderCost(threads, memory_mb, est_seconds)
+
+
+def _read_meminfo() -> Dict[str, int]:
+    """Read /proc/meminfo values in MB (empty dict on non-Linux hosts)"""
+    info = {}
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                key, value = line.split(':', 1)
+                info[key] = int(value.split()[0]) // 1024
+    except (OSError, ValueError):
+        pass
+    return info
+
+
+class _Reservation:
+    """A running render holding part of the host budget"""
+    def __init__(self, cost: RenderCost):
+        self.cost = cost
+        self.started_at = time.monotonic()
+
+    @property
+    def expected_end(self) -> float:
+        return self.started_at + self.cost.est_seconds
+
+
+class _Waiter:
+    """A render queued for admission"""
+    def __init__(self, cost: RenderCost, lane: str):
+        self.cost = cost
+        self.lane = lane
+        self.enqueued_at = time.monotonic()
+
+
+class RenderScheduler:
+    """Admission controller sharing one host's CPU and memory budget between renders"""
+
+    def __init__(self, cpu_budget: int = 0, memory_budget_mb: int = 0,
+                 lane_weights: Optional[Dict[str, int]] = None, max_wait: float = 300):
+        """
+        Initialize render scheduler
+
+        Args:
+            cpu_budget: Encoder threads allowed at once (0 = number of CPUs)
+            memory_budget_mb: Memory allowed for renders in MB (0 = 80% of host memory)
+            lane_weights: Relative capacity share per priority lane
+            max_wait: Seconds after which a waiting render jumps ahead of every lane
+        """
+        self.cpu_budget = cpu_budget or os.cpu_count() or 1
+        if not memory_budget_mb:
+            total = _read_meminfo().get('MemTotal', 0)
+            memory_budget_mb = int(total * 0.8) if total else 4096
+        self.memory_budget_mb = memory_budget_mb
+
+        self._cond = threading.Condition()
+        self._running: List[_Reservation] = []
+        self._waiting: List[_Waiter] = []
+        # Bumped on every change waiters care about, so none is missed while unlocked
+        self._generation = 0
+
+        # Stride scheduling: each lane advances its pass by 1/weight per admitted render
+        self.lane_weights = dict(lane_weights or LANE_WEIGHTS)
+        self.max_wait = max_wait
+        self._lane_pass = {lane: 0.0 for lane in self.lane_weights}
+        self._virtual_time = 0.0
+
+        # Observed wall time / estimated wall time, used to correct ETAs
+        self._speed_ratio = 1.0
+
+    def _clamp(self, cost: RenderCost) -> RenderCost:
+        """Jobs larger than the whole budget may still run, but alone"""
+        return RenderCost(
+            min(cost.threads, self.cpu_budget),
+            min(cost.memory_mb, self.memory_budget_mb),
+            cost.est_seconds
+        )
+
+    def _used(self):
+        threads = sum(r.cost.threads for r in self._running)
+        memory = sum(r.cost.memory_mb for r in self._running)
+        return threads, memory
+
+    def _fits(self, cost: RenderCost) -> bool:
+        threads, memory = self._used()
+        if threads + cost.threads > self.cpu_budget or memory + cost.memory_mb > self.memory_budget_mb:
+            return False
+
+        # Respect memory other processes are using right now
+        available = _read_meminfo().get('MemAvailable')
+        if available is not None and self._running and available < cost.memory_mb:
+            return False
+        return True
+
+    def _changed(self):
+        """Wake waiting admits (caller holds the lock)"""
+        self._generation += 1
+        self._cond.notify_all()
+
+    def has_capacity(self, cost: Optional[RenderCost] = None) -> bool:
+        """Check whether a render of the given cost (default: smallest) could start now"""
+        cost = self._clamp(cost or estimate_render_cost('basic', 30))
+        with self._cond:
+            return not self._waiting and self._fits(cost)
+
+    def estimate_wait(self, cost: RenderCost, lane: str = DEFAULT_LANE) -> float:
+        """
+        Estimate seconds until a newly queued render of this cost would start
+
+        Simulates running renders finishing in expected order, admitting queued renders
+        in lane dispatch order
+        """
+        waiter = _Waiter(self._clamp(cost), lane)
+        with self._cond:
+            order = self._dispatch_order(self._waiting + [waiter])
+            return self._estimate_wait_locked([w.cost for w in order[:order.index(waiter) + 1]])
+
+    def _weight(self, lane: str) -> float:
+        return max(self.lane_weights.get(lane, 1), 0.001)
+
+    def _dispatch_order(self, waiting: List[_Waiter]) -> List[_Waiter]:
+        """
+        Order in which waiting renders would be admitted
+
+        Renders waiting longer than max_wait go first (oldest first); the rest are
+        interleaved by stride scheduling over their lanes, FIFO within a lane.
+        """
+        now = time.monotonic()
+        aged = sorted((w for w in waiting if now - w.enqueued_at >= self.max_wait), key=lambda w: w.enqueued_at)
+        lanes: Dict[str, List[_Waiter]] = {}
+        for w in sorted(waiting, key=lambda w: w.enqueued_at):
+            if w not in aged:
+                lanes.setdefault(w.lane, []).append(w)
+
+        passes = {lane: max(self._lane_pass.get(lane, 0.0), self._virtual_time) for lane in lanes}
+        order = list(aged)
+        while lanes:
+            lane = min(lanes, key=lambda l: (passes[l], -self._weight(l)))
+            order.append(lanes[lane].pop(0))
+            passes[lane] += 1.0 / self._weight(lane)
+            if not lanes[lane]:
+                del lanes[lane]
+        return order
+
+    def _estimate_wait_locked(self, queue: List[RenderCost]) -> float:
+        now = time.monotonic()
+        ends = [(max(r.expected_end - now, 0) * self._speed_ratio, r.cost) for r in self._running]
+        clock = 0.0
+        start = 0.0
+
+        for queued in queue:
+            while True:
+                threads = sum(c.threads for _, c in ends)
+                memory = sum(c.memory_mb for _, c in ends)
+                if threads + queued.threads <= self.cpu_budget and memory + queued.memory_mb <= self.memory_budget_mb:
+                    break
+                ends.sort(key=lambda item: item[0])
+                clock = max(clock, ends.pop(0)[0])
+            start = clock
+            ends.append((clock + queued.est_seconds * self._speed_ratio, queued))
+
+        return start
+
+    @contextmanager
+    def admit(self, cost: RenderCost, on_wait=None, lane: str = DEFAULT_LANE, joined_lanes=None):
+        """
+        Block until the render is next in its lane order and fits in the host budget,
+        then hold its reservation
+
+        Args:
+            cost: Render cost
+            on_wait: Optional callback(eta_seconds, position) called while queued
+            lane: Priority lane ('credit' or 'trial')
+            joined_lanes: Optional callable returning the lanes of requests sharing this
+                render; while queued the render moves up to the highest-weight one
+        """
+        waiter = _Waiter(self._clamp(cost), lane)
+        cost = waiter.cost
+        reservation = None
+
+        with self._cond:
+            self._waiting.append(waiter)
+        try:
+            while True:
+                shared_lanes = joined_lanes() if joined_lanes else []
+                with self._cond:
+                    for shared_lane in shared_lanes:
+                        if self._weight(shared_lane) > self._weight(waiter.lane):
+                            logger.info(f"Raising queued {waiter.lane} render to the {shared_lane} lane")
+                            waiter.lane = shared_lane
+                            self._changed()
+                    order = self._dispatch_order(self._waiting)
+                    if order[0] is waiter and self._fits(cost):
+                        # Advance the lane's stride pass so other lanes get their share
+                        lane = waiter.lane
+                        lane_pass = max(self._lane_pass.get(lane, 0.0), self._virtual_time)
+                        self._virtual_time = lane_pass
+                        self._lane_pass[lane] = lane_pass + 1.0 / self._weight(lane)
+
+                        self._waiting.remove(waiter)
+                        reservation = _Reservation(cost)
+                        self._running.append(reservation)
+                        self._changed()
+                        break
+                    generation = self._generation
+                    position = order.index(waiter)
+                    eta = self._estimate_wait_locked([w.cost for w in order[:position + 1]]) if on_wait else None
+
+                # The callback runs unlocked so a slow UI can't stall other admits and releases
+                if on_wait:
+                    on_wait(eta, position)
+                with self._cond:
+                    self._cond.wait_for(lambda: self._generation != generation, timeout=1.0)
+        finally:
+            if reservation is None:
+                with self._cond:
+                    self._waiting.remove(waiter)
+                    self._changed()
+
+        logger.info(f"Admitted {lane} render {cost}; running={len(self._running)}")
+        try:
+            yield reservation
+        finally:
+            elapsed = time.monotonic() - reservation.started_at
+            with self._cond:
+                self._running.remove(reservation)
+                if cost.est_seconds > 0:
+                    self._speed_ratio = 0.8 * self._speed_ratio + 0.2 * (elapsed / cost.est_seconds)
+                self._changed()
+
+    def stats(self) -> Dict[str, Any]:
+        """Current budget usage"""
+        with self._cond:
+            threads, memory = self._used()
+            return {
+                'running': len(self._running),
+                'waiting': len(self._waiting),
+                'waiting_by_lane': {
+                    lane: sum(1 for w in self._waiting if w.lane == lane) for lane in self.lane_weights
+                },
+                'cpu_used': threads,
+                'cpu_budget': self.cpu_budget,
+                'memory_used_mb': memory,
+                'memory_budget_mb': self.memory_budget_mb,
+                'speed_ratio': round(self._speed_ratio, 2)
+            }
+
+
+# Global scheduler instance (one budget per host process)
+_scheduler_instance = None
+_scheduler_lock = threading.Lock()
+
+def get_render_scheduler(config: Dict[str, Any]) -> RenderScheduler:
+    """Get or create the global render scheduler"""
+    global _scheduler_instance
+    with _scheduler_lock:
+        if _scheduler_instance is None:
+            render_config = config.get('render', {})
+            _scheduler_instance = RenderScheduler(
+                cpu_budget=int(render_config.get('cpu_budget', 0)),
+                memory_budget_mb=int(render_config.get('memory_budget_mb', 0)),
+                lane_weights=render_config.get('lane_weights'),
+                max_wait=float(render_config.get('lane_max_wait', 300))
+            )
+        return _scheduler_instance
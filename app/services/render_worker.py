@@ -0,0 +1,241 @@
+"""
+Render Worker for the shared Postgres job queue
+Claims queued render jobs, heartbeats while rendering, and reclaims jobs from crashed workers
+"""
+
+import os
+import copy
+import time
+import socket
+import threading
+import logging
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from app.database import get_database
+from .video_service import VideoService
+from .render_scheduler import lane_claim_order
+from .render_cancellation import CancellationToken, RenderCancelled
+
+logger = logging.getLogger(__name__)
+
+# Pipeline stage for each progress milestone reported by VideoService._render_video
+PROGRESS_STAGES = [
+    (10, 'script'),
+    (30, 'voiceover'),
+    (50, 'clips'),
+    (55, 'waiting'),
+    (60, 'composing'),
+    (85, 'encoding')
+]
+
+
+def progress_stage(percent: int) -> str:
+    """Name of the pipeline stage a progress percentage belongs to"""
+    stage = 'queued'
+    for start, name in PROGRESS_STAGES:
+        if percent >= start:
+            stage = name
+    return stage
+
+
+class RenderWorker:
+    """Standalone worker that renders jobs claimed from the render_jobs table"""
+
+    def __init__(self, config: Dict[str, Any], worker_id: Optional[str] = None, db=None):
+        """
+        Initialize render worker
+
+        Args:
+            config: Application configuration
+            worker_id: Unique worker name (defaults to hostname:pid)
+            db: Database instance (defaults to the global database)
+        """
+        self.render_config = config.get('render', {})
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.db = db or get_database()
+
+        self.poll_interval = float(self.render_config.get('poll_interval', 2.0))
+        self.heartbeat_interval = float(self.render_config.get('heartbeat_interval', 10.0))
+        self.cancel_poll_interval = float(self.render_config.get('cancel_poll_interval', 2.0))
+        self.progress_interval = float(self.render_config.get('progress_interval', 1.0))
+        self.stale_after = int(self.render_config.get('stale_after', 60))
+        self.max_attempts = int(self.render_config.get('max_attempts', 3))
+        self.concurrency = max(1, int(self.render_config.get('concurrency', 1)))
+        self.lane_weights = self.render_config.get('lane_weights')
+        self.lane_max_wait = int(self.render_config.get('lane_max_wait', 300))
+
+        # Rendered videos go to the shared directory so any web replica can serve them
+        shared_dir = Path(self.render_config.get('shared_dir', './shared'))
+        worker_config = copy.deepcopy(config)
+        worker_config['video']['output_dir'] = str(shared_dir / 'videos')
+        self.video_service = VideoService(worker_config)
+        self.scheduler = self.video_service.scheduler
+
+        # Expired search cache entries are deleted by workers (no other process cleans them)
+        self.search_cache = self.video_service.search_cache
+        self.search_cache_purge_interval = float(worker_config['video'].get('search_cache_purge_interval', 3600))
+        self._next_purge = 0.0
+        self._purge_lock = threading.Lock()
+
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        """Ask the worker to exit after the current job"""
+        self._stop_event.set()
+
+    def run(self, once: bool = False):
+        """
+        Poll the queue and render jobs until stopped
+
+        Args:
+            once: Process at most one job per slot and return (useful for cron-style runs)
+        """
+        logger.info(f"Render worker {self.worker_id} started with {self.concurrency} slot(s)")
+
+        slots = [
+            threading.Thread(target=self._run_slot, args=(once,), name=f"render-slot-{i}")
+            for i in range(self.concurrency)
+        ]
+        for slot in slots:
+            slot.start()
+        for slot in slots:
+            slot.join()
+
+        logger.info(f"Render worker {self.worker_id} stopped")
+
+    def _run_slot(self, once: bool):
+        """Claim and render jobs one at a time"""
+        while not self._stop_event.is_set():
+            job = None
+
+            # Leave jobs in the queue for other hosts while this one is saturated
+            if self.scheduler.has_capacity():
+                try:
+                    reclaimed = self.db.reclaim_stale_render_jobs(self.stale_after, self.max_attempts)
+                    if reclaimed:
+                        logger.warning(f"Reclaimed {reclaimed} stale render job(s)")
+                    self._purge_search_cache()
+
+                    job = self.db.claim_render_job(
+                        self.worker_id,
+                        lane_order=lane_claim_order(self.lane_weights),
+                        max_wait_seconds=self.lane_max_wait
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to poll render queue: {e}")
+
+            if job:
+                self.process_job(job)
+                if once:
+                    break
+            elif once:
+                break
+            else:
+                self._stop_event.wait(self.poll_interval)
+
+    def _purge_search_cache(self):
+        """Delete expired search cache entries, at most once per purge interval per worker"""
+        if not self.search_cache:
+            return
+        with self._purge_lock:
+            now = time.monotonic()
+            if now < self._next_purge:
+                return
+            self._next_purge = now + self.search_cache_purge_interval
+        try:
+            purged = self.search_cache.purge()
+            if purged:
+                logger.info(f"Purged {purged} expired clip search cache entries")
+        except Exception as e:
+            logger.warning(f"Failed to purge clip search cache: {e}")
+
+    def process_job(self, job: Dict[str, Any]):
+        """
+        Render a single claimed job, heartbeating until it finishes
+
+        Args:
+            job: Render job row
+        """
+        job_id = job['id']
+        logger.info(f"Worker {self.worker_id} rendering {job.get('lane')} job {job_id} (attempt {job['attempts']})")
+
+        done = threading.Event()
+        cancel_token = CancellationToken()
+        heartbeat = threading.Thread(
+            target=self._heartbeat_loop, args=(job_id, done, cancel_token), daemon=True
+        )
+        heartbeat.start()
+
+        try:
+            params = dict(job['params'], lane=job.get('lane', 'credit'))
+            result = self.video_service.generate_video(
+                params,
+                progress_callback=self._progress_publisher(job_id),
+                cancel_token=cancel_token
+            )
+            if self.db.complete_render_job(job_id, self.worker_id, result['video_path']):
+                logger.info(f"Job {job_id} completed: {result['video_path']}")
+            else:
+                logger.warning(f"Job {job_id} was reclaimed before completion, discarding result")
+        except RenderCancelled:
+            logger.info(f"Job {job_id} cancelled")
+            try:
+                self.db.mark_render_job_cancelled(job_id, self.worker_id)
+            except Exception as db_error:
+                logger.error(f"Failed to record cancellation for job {job_id}: {db_error}")
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+            try:
+                self.db.fail_render_job(job_id, self.worker_id, str(e))
+            except Exception as db_error:
+                logger.error(f"Failed to record failure for job {job_id}: {db_error}")
+        finally:
+            done.set()
+            heartbeat.join(timeout=self.heartbeat_interval)
+
+    def _progress_publisher(self, job_id: str):
+        """
+        Progress callback publishing events on the job's NOTIFY channel
+        Updates within a stage are throttled to progress_interval; stage changes always go out.
+        """
+        started = time.monotonic()
+        last = {'stage': None, 'at': 0.0}
+
+        def publish(progress, message):
+            stage = progress_stage(progress)
+            now = time.monotonic()
+            if stage == last['stage'] and now - last['at'] < self.progress_interval:
+                return
+            last.update(stage=stage, at=now)
+
+            # Linear extrapolation from elapsed time; the wait stage message carries its own ETA
+            eta = int((now - started) * (100 - progress) / progress) if progress >= 10 else None
+            try:
+                self.db.publish_render_job_progress(job_id, self.worker_id, stage, progress, message, eta)
+            except Exception as e:
+                logger.warning(f"Failed to publish progress for job {job_id}: {e}")
+
+        return publish
+
+    def _heartbeat_loop(self, job_id: str, done: threading.Event, cancel_token: CancellationToken):
+        """
+        Keep the job's heartbeat fresh so other workers don't reclaim it,
+        and cancel the render once cancellation is requested (or ownership is lost)
+        """
+        last_heartbeat = 0.0
+        while not done.wait(self.cancel_poll_interval):
+            try:
+                if self.db.is_render_job_cancel_requested(job_id):
+                    cancel_token.cancel("Cancelled by user")
+                    return
+
+                last_heartbeat += self.cancel_poll_interval
+                if last_heartbeat >= self.heartbeat_interval:
+                    last_heartbeat = 0.0
+                    if not self.db.heartbeat_render_job(job_id, self.worker_id):
+                        logger.warning(f"Lost ownership of job {job_id}")
+                        cancel_token.cancel("Job was reclaimed by another worker")
+                        return
+            except Exception as e:
+                logger.warning(f"Heartbeat failed for job {job_id}: {e}")
@@ -0,0 +1,165 @@
+"""
+Speech Limiter for Azure Speech rate limits
+Process-wide AIMD concurrency limit shared by every synthesis and recognition call:
+additive increase while calls succeed, multiplicative decrease when the service throttles,
+and jittered retries of throttled calls
+"""
+
+import time
+import random
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Optional, TypeVar
+
+import azure.cognitiveservices.speech as speechsdk
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+# Cancellation error codes meaning "slow down and retry" rather than a real failure
+THROTTLE_ERROR_CODES = (
+    speechsdk.CancellationErrorCode.TooManyRequests,
+    speechsdk.CancellationErrorCode.ServiceUnavailable,
+    speechsdk.CancellationErrorCode.ServiceTimeout
+)
+
+
+class SpeechThrottled(Exception):
+    """Raised by a speech call the service rejected for load (429, unavailable, timeout)"""
+    pass
+
+
+def is_throttled(cancellation_details) -> bool:
+    """Whether a canceled speech result was canceled because of service load"""
+    return getattr(cancellation_details, 'error_code', None) in THROTTLE_ERROR_CODES
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter with jittered exponential backoff"""
+
+    def __init__(self, initial: int = 4, min_limit: int = 1, max_limit: int = 32,
+                 decrease: float = 0.5, max_retries: int = 4, base_delay: float = 0.5,
+                 max_delay: float = 8.0):
+        """
+        Initialize adaptive limiter
+
+        Args:
+            initial: Starting concurrency limit
+            min_limit: Lowest limit backoff can reach
+            max_limit: Highest limit ramp-up can reach
+            decrease: Factor applied to the limit on throttling
+            max_retries: Retries of a throttled call before giving up
+            base_delay: First retry delay in seconds (doubles per retry, full jitter)
+            max_delay: Cap on a single retry delay
+        """
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.decrease = decrease
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._cond = threading.Condition()
+        self._limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._waiting = 0
+        self._last_decrease = 0.0
+        self._throttled = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @contextmanager
+    def slot(self):
+        """Hold one unit of concurrency for a speech call"""
+        with self._cond:
+            self._waiting += 1
+            try:
+                while self._in_flight >= int(self._limit):
+                    self._cond.wait()
+            finally:
+                self._waiting -= 1
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+    def on_success(self):
+        """Additive increase: about +1 to the limit per limit's worth of successful calls"""
+        with self._cond:
+            if self._limit < self.max_limit:
+                self._limit = min(self._limit + 1.0 / self._limit, float(self.max_limit))
+                self._cond.notify_all()
+
+    def on_throttle(self):
+        """Multiplicative decrease, at most once per backoff window so one burst counts once"""
+        with self._cond:
+            self._throttled += 1
+            now = time.monotonic()
+            if now - self._last_decrease < self.base_delay:
+                return
+            self._last_decrease = now
+            previous = self.limit
+            self._limit = max(self._limit * self.decrease, float(self.min_limit))
+            logger.warning(f"Speech service throttled; concurrency limit {previous} -> {self.limit}")
+
+    def call(self, fn: Callable[[], T]) -> T:
+        """
+        Run a speech call within the limit, retrying throttled attempts with jittered backoff
+
+        Raises:
+            SpeechThrottled: If the call is still throttled after max_retries retries
+        """
+        attempt = 0
+        while True:
+            with self.slot():
+                try:
+                    result = fn()
+                except SpeechThrottled:
+                    self.on_throttle()
+                    if attempt >= self.max_retries:
+                        raise
+                else:
+                    self.on_success()
+                    return result
+
+            # Back off outside the slot so other calls can use it
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+            attempt += 1
+            logger.info(f"Retrying throttled speech call in {delay:.2f}s (attempt {attempt}/{self.max_retries})")
+            time.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """Current limit, calls running and calls queued"""
+        with self._cond:
+            return {
+                'limit': self.limit,
+                'in_flight': self._in_flight,
+                'queue_depth': self._waiting,
+                'throttled': self._throttled
+            }
+
+
+# Global limiter instance (one per process, shared by all speech calls)
+_limiter_instance = None
+_limiter_lock = threading.Lock()
+
+def get_speech_limiter(config: Optional[Dict[str, Any]] = None) -> AdaptiveLimiter:
+    """Get or create the global speech limiter (config applies on first creation)"""
+    global _limiter_instance
+    with _limiter_lock:
+        if _limiter_instance is None:
+            azure_config = (config or {}).get('azure', {})
+            _limiter_instance = AdaptiveLimiter(
+                initial=int(azure_config.get('speech_concurrency', 4)),
+                max_limit=int(azure_config.get('speech_max_concurrency', 32)),
+                max_retries=int(azure_config.get('speech_max_retries', 4))
+            )
+        return _limiter_instance
@@ -1,39 +1,46 @@
 """
-Subtitle Service for generating subtitles from audio
-Uses Azure Speech SDK (edge method) for word-level timestamps
+Subtitle Service for generating subtitles
+Builds subtitles from TTS word boundaries, from audio with the Azure Speech SDK
+(edge method) for word-level timestamps, recognizing silence-split chunks in parallel,
+or offline by aligning the known narration text to the speech found in the audio
 """
 
 import os
+import re
+import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
 import azure.cognitiveservices.speech as speechsdk
 
-logger = logging.getLogger(__name__)
-
+from app.models.timeline import SubtitleItem
+from app.utils.audio import SAMPLE_WIDTH, read_pcm, pcm_duration, split_at_silence, speech_segments
+from .speech_limiter import AdaptiveLimiter, SpeechThrottled, get_speech_limiter, is_throttled
 
-class SubtitleItem:
-    """Represents a single subtitle item with timing"""
-    def __init__(self, start: float, end: float, text: str):
-        self.start = start
-        self.end = end
-        self.text = text
+logger = logging.getLogger(__name__)
 
-    def __repr__(self):
-        return f"SubtitleItem({self.start:.2f}s - {self.end:.2f}s: '{self.text}')"
+# Seconds a recognition pass may run beyond its audio's length before it is abandoned
+RECOGNITION_TIMEOUT = 30
 
 
 class SubtitleService:
     """Service for generating subtitles from audio files"""
 
-    def __init__(self, speech_config):
+    def __init__(self, speech_config, limiter: Optional[AdaptiveLimiter] = None, chunk_seconds: float = 30.0):
         """
         Initialize subtitle service
 
         Args:
-            speech_config: Azure SpeechConfig object
+            speech_config: Azure SpeechConfig object (None = word-boundary subtitles only)
+            limiter: Speech concurrency limiter recognition runs under (defaults to the global one)
+            chunk_seconds: Approximate length of the audio chunks recognized in parallel
         """
         self.speech_config = speech_config
+        self.limiter = limiter or get_speech_limiter()
+        self.chunk_seconds = chunk_seconds
 
     def generate_subtitles(self, audio_path: str, language: str = 'en') -> List[SubtitleItem]:
         """
@@ -49,6 +56,28 @@ class SubtitleService:
         if not os.path.exists(audio_path):
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
 
+        logger.info(f"Starting speech recognition for: {audio_path}")
+        pcm, sample_rate = read_pcm(audio_path)
+        return self.generate_subtitles_from_pcm(pcm, sample_rate, language)
+
+    def generate_subtitles_from_pcm(self, pcm: bytes, sample_rate: int, language: str = 'en') -> List[SubtitleItem]:
+        """
+        Generate subtitles from 16-bit mono PCM using Azure Speech SDK
+
+        The audio is split at pauses into chunks that are recognized concurrently (within the
+        shared speech concurrency limit); word timings are shifted by each chunk's offset and merged.
+
+        Args:
+            pcm: 16-bit mono PCM
+            sample_rate: Sample rate in Hz
+            language: Language code (e.g., 'en', 'zh', 'ar')
+
+        Returns:
+            List of SubtitleItem objects with word-level timing
+        """
+        if not self.speech_config:
+            raise Exception("Azure Speech Services not configured; speech recognition unavailable")
+
         # Map language codes to Azure locale
         language_map = {
             'en': 'en-US',
@@ -57,8 +86,41 @@ class SubtitleService:
         }
         locale = language_map.get(language, 'en-US')
 
+        chunks = split_at_silence(pcm, sample_rate, self.chunk_seconds)
+        if not chunks:
+            return []
+        logger.info(f"Recognizing {pcm_duration(pcm, sample_rate):.1f}s of audio in {len(chunks)} chunks")
+
+        def recognize(chunk):
+            start, end = chunk
+            chunk_pcm = pcm[start * SAMPLE_WIDTH:end * SAMPLE_WIDTH]
+            # Recognition counts against the shared speech concurrency limit; throttled chunks are retried
+            return self.limiter.call(lambda: self._recognize(chunk_pcm, sample_rate, locale))
+
+        with ThreadPoolExecutor(max_workers=min(len(chunks), self.limiter.max_limit)) as executor:
+            results = list(executor.map(recognize, chunks))
+
+        words = []
+        for (start, _), chunk_words in zip(chunks, results):
+            offset = start / sample_rate
+            words.extend({
+                'text': word['text'],
+                'start': word['start'] + offset,
+                'end': word['end'] + offset
+            } for word in chunk_words)
+
+        subtitles = self.build_subtitles_from_word_boundaries(words)
+        logger.info(f"Generated {len(subtitles)} subtitle segments")
+        return subtitles
+
+    def _recognize(self, pcm: bytes, sample_rate: int, locale: str) -> List[Dict[str, Any]]:
+        """
+        Run one continuous recognition pass over a PCM chunk
+
+        Returns:
+            Word timings, each {'text', 'start', 'end'} in seconds from the start of the chunk
+        """
         # Configure speech recognizer
-        audio_config = speechsdk.AudioConfig(filename=audio_path)
         speech_config = speechsdk.SpeechConfig(
             subscription=self.speech_config.subscription_key,
             region=self.speech_config.region
@@ -69,71 +131,163 @@ class SubtitleService:
         # Enable detailed results
         speech_config.output_format = speechsdk.OutputFormat.Detailed
 
+        stream = speechsdk.audio.PushAudioInputStream(
+            speechsdk.audio.AudioStreamFormat(samples_per_second=sample_rate, bits_per_sample=16, channels=1)
+        )
+        stream.write(pcm)
+        stream.close()
+
         recognizer = speechsdk.SpeechRecognizer(
             speech_config=speech_config,
-            audio_config=audio_config
+            audio_config=speechsdk.audio.AudioConfig(stream=stream)
         )
 
-        subtitles = []
+        words = []
+        cancellations = []
+        done = threading.Event()
 
         def handle_final_result(evt):
             """Handle recognized speech with word-level timestamps"""
-            if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech:
-                try:
-                    import json
-                    # Get detailed results with word timings
-                    detailed = json.loads(evt.result.json)
-
-                    if 'NBest' in detailed and len(detailed['NBest']) > 0:
-                        best = detailed['NBest'][0]
-
-                        if 'Words' in best:
-                            # Group words into subtitle chunks (5-7 words per subtitle)
-                            words = best['Words']
-                            chunk_size = 6
-
-                            for i in range(0, len(words), chunk_size):
-                                chunk_words = words[i:i + chunk_size]
-
-                                if chunk_words:
-                                    # Convert from ticks (100ns) to seconds
-                                    start_time = chunk_words[0]['Offset'] / 10000000
-                                    end_time = (chunk_words[-1]['Offset'] + chunk_words[-1]['Duration']) / 10000000
-                                    text = ' '.join([w['Word'] for w in chunk_words])
-
-                                    subtitle = SubtitleItem(start_time, end_time, text)
-                                    subtitles.append(subtitle)
-                                    logger.info(f"Subtitle: {subtitle}")
-                except Exception as e:
-                    logger.error(f"Error processing word-level timestamps: {e}")
-                    # Fallback: create subtitle from full text
-                    if evt.result.text:
-                        subtitle = SubtitleItem(0, 0, evt.result.text)
-                        subtitles.append(subtitle)
-
-        # Connect callbacks
+            if evt.result.reason != speechsdk.ResultReason.RecognizedSpeech:
+                return
+            try:
+                # Get detailed results with word timings (offsets in 100ns ticks)
+                detailed = json.loads(evt.result.json)
+                best = detailed['NBest'][0]
+                for word in best['Words']:
+                    start = word['Offset'] / 10000000
+                    words.append({'text': word['Word'], 'start': start, 'end': start + word['Duration'] / 10000000})
+            except (ValueError, KeyError, IndexError) as e:
+                logger.error(f"Error processing word-level timestamps: {e}")
+                # Fallback: one entry spanning the whole phrase
+                if evt.result.text:
+                    start = evt.result.offset / 10000000
+                    words.append({'text': evt.result.text, 'start': start, 'end': start + evt.result.duration / 10000000})
+
+        def handle_canceled(evt):
+            cancellations.append(evt.cancellation_details)
+            done.set()
+
+        # Connect callbacks; the session stops once the stream is fully recognized
         recognizer.recognized.connect(handle_final_result)
+        recognizer.canceled.connect(handle_canceled)
+        recognizer.session_stopped.connect(lambda evt: done.set())
 
-        # Start continuous recognition
-        logger.info(f"Starting speech recognition for: {audio_path}")
         recognizer.start_continuous_recognition()
+        finished = done.wait(pcm_duration(pcm, sample_rate) + RECOGNITION_TIMEOUT)
+        recognizer.stop_continuous_recognition()
 
-        # Wait for recognition to complete
-        import time
-        # Get audio duration to know how long to wait
-        try:
-            from moviepy import AudioFileClip
-            with AudioFileClip(audio_path) as audio:
-                duration = audio.duration
-            time.sleep(duration + 2)  # Wait for audio duration + buffer
-        except:
-            time.sleep(10)  # Default wait time
+        if not finished:
+            raise Exception("Speech recognition timed out")
+        for details in cancellations:
+            if is_throttled(details):
+                raise SpeechThrottled(f"Speech recognition throttled: {details.error_details}")
+            if details.reason == speechsdk.CancellationReason.Error:
+                raise Exception(f"Speech recognition canceled: {details.error_details}")
 
-        recognizer.stop_continuous_recognition()
+        words.sort(key=lambda word: word['start'])
+        return words
 
-        logger.info(f"Generated {len(subtitles)} subtitle segments")
+    def build_subtitles_from_word_boundaries(self, words: List[Dict[str, Any]], chunk_size: int = 6,
+                                             max_gap: float = 0.5) -> List[SubtitleItem]:
+        """
+        Build subtitles from TTS word boundary timings (no speech recognition needed)
+
+        Args:
+            words: Word timings in track order, each {'text', 'start', 'end'} in seconds
+            chunk_size: Maximum words per subtitle
+            max_gap: Silence in seconds that always starts a new subtitle (e.g. between scenes)
+
+        Returns:
+            List of SubtitleItem objects
+        """
+        subtitles = []
+        chunk = []
+
+        def flush():
+            if chunk:
+                text = ' '.join(w['text'] for w in chunk)
+                subtitles.append(SubtitleItem(chunk[0]['start'], chunk[-1]['end'], text))
+                chunk.clear()
+
+        for word in words:
+            if chunk and (len(chunk) >= chunk_size or word['start'] - chunk[-1]['end'] > max_gap):
+                flush()
+            chunk.append(word)
+        flush()
+
+        logger.info(f"Built {len(subtitles)} subtitle segments from word boundaries")
         return subtitles
 
+    def align_narration(self, pcm: bytes, sample_rate: int, texts: List[str],
+                        spans: Optional[List[Tuple[float, float]]] = None) -> List[SubtitleItem]:
+        """
+        Fit known narration text to the voiceover audio, offline (no speech service)
+
+        Speech segments are found with an energy pass over the PCM, and each text's words
+        are spread over the speech in its span in proportion to their estimated syllables
+        (characters for scripts without Latin vowels); pauses between segments stay empty.
+
+        Args:
+            pcm: 16-bit mono PCM of the voiceover
+            sample_rate: Sample rate in Hz
+            texts: Narration texts in track order
+            spans: (start, end) seconds each text occupies; without spans the texts are
+                treated as one narration covering the whole audio
+
+        Returns:
+            List of SubtitleItem objects
+        """
+        duration = pcm_duration(pcm, sample_rate)
+        if spans is None:
+            texts = [' '.join(texts)]
+            spans = [(0.0, duration)]
+
+        words = []
+        for text, (start, end) in zip(texts, spans):
+            first = int(max(start, 0.0) * sample_rate) * SAMPLE_WIDTH
+            last = int(min(end, duration) * sample_rate) * SAMPLE_WIDTH
+            words.extend(self._align_words(pcm[first:last], sample_rate, text, start))
+
+        subtitles = self.build_subtitles_from_word_boundaries(words)
+        logger.info(f"Aligned {len(words)} narration words to the voiceover")
+        return subtitles
+
+    def _align_words(self, pcm: bytes, sample_rate: int, text: str, offset: float) -> List[Dict[str, Any]]:
+        """Spread one text's words over the speech in a stretch of audio starting at offset seconds"""
+        tokens = (text or '').split()
+        if not tokens or not pcm:
+            return []
+
+        segments = speech_segments(pcm, sample_rate) or [(0.0, pcm_duration(pcm, sample_rate))]
+        seg_starts = np.array([start for start, _ in segments])
+        seg_ends = np.array([end for _, end in segments])
+        # Speech time elapsed at the start of each segment, with pauses removed
+        speech_before = np.concatenate(([0.0], np.cumsum(seg_ends - seg_starts)))
+        total_speech = speech_before[-1]
+
+        weights = np.array([self._word_weight(token) for token in tokens], dtype=np.float64)
+        bounds = np.concatenate(([0.0], np.cumsum(weights))) / weights.sum() * total_speech
+        centers = (bounds[:-1] + bounds[1:]) / 2
+
+        # Each word lives in the segment holding its center; its edges are clamped to that segment
+        index = np.clip(np.searchsorted(speech_before, centers, side='right') - 1, 0, len(segments) - 1)
+        starts = np.maximum(seg_starts[index] + bounds[:-1] - speech_before[index], seg_starts[index])
+        ends = np.minimum(seg_starts[index] + bounds[1:] - speech_before[index], seg_ends[index])
+
+        return [
+            {'text': token, 'start': round(offset + float(start), 3), 'end': round(offset + float(end), 3)}
+            for token, start, end in zip(tokens, starts, ends)
+        ]
+
+    def _word_weight(self, word: str) -> float:
+        """Relative speaking time of a word: vowel groups (syllables), else its characters"""
+        letters = re.sub(r'[^\w]', '', word.lower())
+        syllables = len(re.findall(r'[aeiouy\u00e0-\u00ff]+', letters))
+        if syllables:
+            return float(syllables)
+        return float(max(len(letters), 1))
+
     def save_to_srt(self, subtitles: List[SubtitleItem], output_path: str):
         """
         Save subtitles to SRT file
@@ -155,19 +309,42 @@ class SubtitleService:
 
         logger.info(f"Saved {len(subtitles)} subtitles to: {output_path}")
 
-    def _format_timestamp(self, seconds: float) -> str:
+    def save_to_vtt(self, subtitles: List[SubtitleItem], output_path: str):
+        """
+        Save subtitles to WebVTT file
+
+        Args:
+            subtitles: List of SubtitleItem objects
+            output_path: Path to save VTT file
+        """
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write("WEBVTT\n\n")
+            for subtitle in subtitles:
+                # Format: HH:MM:SS.mmm
+                start_time = self._format_timestamp(subtitle.start, '.')
+                end_time = self._format_timestamp(subtitle.end, '.')
+
+                f.write(f"{start_time} --> {end_time}\n")
+                f.write(f"{subtitle.text}\n")
+                f.write("\n")
+
+        logger.info(f"Saved {len(subtitles)} subtitles to: {output_path}")
+
+    def _format_timestamp(self, seconds: float, separator: str = ',') -> str:
         """
         Format seconds to SRT timestamp format
 
         Args:
             seconds: Time in seconds
+            separator: Separator before the milliseconds (',' for SRT, '.' for WebVTT)
 
         Returns:
             Formatted timestamp (HH:MM:SS,mmm)
         """
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        millis = int((seconds % 1) * 1000)
+        total_millis = int(round(seconds * 1000))
+        hours = total_millis // 3600000
+        minutes = (total_millis % 3600000) // 60000
+        secs = (total_millis % 60000) // 1000
+        millis = total_millis % 1000
 
-        return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+        return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
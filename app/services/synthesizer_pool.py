@@ -0,0 +1,215 @@
+"""
+Synthesizer Pool for Azure TTS
+Keeps pre-connected SpeechSynthesizers per voice so synthesis skips connection setup,
+and hands each one to a single caller at a time; idle synthesizers are closed after
+IDLE_TIMEOUT and the idle pool is capped across all voices
+"""
+
+import time
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+import azure.cognitiveservices.speech as speechsdk
+
+logger = logging.getLogger(__name__)
+
+# Idle synthesizers older than this are closed (the service drops idle connections)
+IDLE_TIMEOUT = 240
+
+# Seconds between sweeps for expired idle synthesizers
+REAP_INTERVAL = 60
+
+# Format every pooled synthesizer produces (see tts_cache.DEFAULT_AUDIO_FORMAT)
+OUTPUT_FORMAT = speechsdk.SpeechSynthesisOutputFormat.Riff16Khz16BitMonoPcm
+
+
+class _PooledSynthesizer:
+    """A synthesizer with its warm connection"""
+    def __init__(self, synthesizer, connection):
+        self.synthesizer = synthesizer
+        self.connection = connection
+        self.last_used = time.monotonic()
+
+
+class SynthesizerPool:
+    """Per-voice pool of warm SpeechSynthesizers with checkout/checkin semantics"""
+
+    def __init__(self, subscription: str, region: str, max_per_voice: int = 4, max_idle: int = 16):
+        """
+        Initialize synthesizer pool
+
+        Args:
+            subscription: Azure Speech subscription key
+            region: Azure Speech region
+            max_per_voice: Synthesizers kept (and checked out at once) per voice
+            max_idle: Idle synthesizers kept across all voices (least recently used are closed)
+        """
+        self.subscription = subscription
+        self.region = region
+        self.max_per_voice = max(1, max_per_voice)
+        self.max_idle = max(1, max_idle)
+
+        self._cond = threading.Condition()
+        self._idle: Dict[str, List[_PooledSynthesizer]] = {}
+        self._created: Dict[str, int] = {}
+
+        self._reaper = threading.Thread(target=self._reap_loop, name='synthesizer-pool-reaper', daemon=True)
+        self._reaper.start()
+
+    def _create(self, voice: str) -> _PooledSynthesizer:
+        """Create a synthesizer for the voice and open its connection ahead of the first request"""
+        speech_config = speechsdk.SpeechConfig(subscription=self.subscription, region=self.region)
+        speech_config.speech_synthesis_voice_name = voice
+        speech_config.set_speech_synthesis_output_format(OUTPUT_FORMAT)
+
+        # No audio output: callers read result.audio_data
+        synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=None)
+        connection = speechsdk.Connection.from_speech_synthesizer(synthesizer)
+        try:
+            connection.open(True)
+        except Exception as e:
+            # The SDK connects on first use anyway
+            logger.warning(f"Failed to pre-connect synthesizer for {voice}: {e}")
+
+        return _PooledSynthesizer(synthesizer, connection)
+
+    def _release_slot(self, voice: str):
+        """Give up one of the voice's slots (caller holds the lock)"""
+        self._created[voice] -= 1
+        if not self._created[voice]:
+            del self._created[voice]
+        self._cond.notify_all()
+
+    def _discard(self, voice: str, pooled: _PooledSynthesizer):
+        _close(pooled)
+        with self._cond:
+            self._release_slot(voice)
+
+    def trim(self) -> int:
+        """
+        Close idle synthesizers past IDLE_TIMEOUT, then the least recently used ones
+        beyond max_idle
+
+        Returns:
+            Number of synthesizers closed
+        """
+        evicted = []
+        with self._cond:
+            now = time.monotonic()
+            idle = sorted(
+                ((pooled.last_used, voice, pooled) for voice, entries in self._idle.items() for pooled in entries),
+                key=lambda item: item[0]
+            )
+            excess = len(idle) - self.max_idle
+            for position, (last_used, voice, pooled) in enumerate(idle):
+                if position < excess or now - last_used > IDLE_TIMEOUT:
+                    self._idle[voice].remove(pooled)
+                    if not self._idle[voice]:
+                        del self._idle[voice]
+                    self._release_slot(voice)
+                    evicted.append(pooled)
+
+        for pooled in evicted:
+            _close(pooled)
+        if evicted:
+            logger.info(f"Closed {len(evicted)} idle synthesizer(s)")
+        return len(evicted)
+
+    def _reap_loop(self):
+        while True:
+            time.sleep(REAP_INTERVAL)
+            try:
+                self.trim()
+            except Exception as e:
+                logger.warning(f"Synthesizer pool sweep failed: {e}")
+
+    def warm(self, voice: str, count: int = 1):
+        """Pre-create up to count idle synthesizers for a voice"""
+        for _ in range(count):
+            with self._cond:
+                if self._created.get(voice, 0) >= self.max_per_voice:
+                    return
+                self._created[voice] = self._created.get(voice, 0) + 1
+            pooled = self._create(voice)
+            with self._cond:
+                self._idle.setdefault(voice, []).append(pooled)
+                self._cond.notify_all()
+        self.trim()
+
+    def _checkout(self, voice: str) -> Tuple[_PooledSynthesizer, bool]:
+        """Take an idle synthesizer, or reserve a slot to create one (blocks at max_per_voice)"""
+        with self._cond:
+            while True:
+                idle = self._idle.get(voice)
+                if idle:
+                    pooled = idle.pop()
+                    if not idle:
+                        del self._idle[voice]
+                    return pooled, False
+                if self._created.get(voice, 0) < self.max_per_voice:
+                    self._created[voice] = self._created.get(voice, 0) + 1
+                    return None, True
+                self._cond.wait()
+
+    @contextmanager
+    def synthesizer(self, voice: str):
+        """
+        Check out a synthesizer for a voice, returning it to the pool afterwards
+
+        Event handlers connected by the caller are removed on checkin. Synthesizers
+        whose synthesis raised are discarded rather than reused.
+        """
+        pooled, create = self._checkout(voice)
+        try:
+            if create:
+                pooled = self._create(voice)
+            elif time.monotonic() - pooled.last_used > IDLE_TIMEOUT:
+                # Stale connection: replace it (keeps the voice's slot)
+                _close(pooled)
+                pooled = self._create(voice)
+        except BaseException:
+            with self._cond:
+                self._release_slot(voice)
+            raise
+
+        try:
+            yield pooled.synthesizer
+        except BaseException:
+            self._discard(voice, pooled)
+            raise
+        else:
+            pooled.synthesizer.synthesis_word_boundary.disconnect_all()
+            pooled.synthesizer.bookmark_reached.disconnect_all()
+            pooled.last_used = time.monotonic()
+            with self._cond:
+                self._idle.setdefault(voice, []).append(pooled)
+                self._cond.notify_all()
+            if self._idle_count() > self.max_idle:
+                self.trim()
+
+    def _idle_count(self) -> int:
+        with self._cond:
+            return sum(len(entries) for entries in self._idle.values())
+
+
+def _close(pooled: _PooledSynthesizer):
+    try:
+        pooled.connection.close()
+    except Exception:
+        pass
+
+
+# Global pools, one per Speech resource (shared by voiceover and preview services)
+_pools: Dict[Tuple[str, str], SynthesizerPool] = {}
+_pools_lock = threading.Lock()
+
+def get_synthesizer_pool(subscription: str, region: str, max_per_voice: int = 4,
+                         max_idle: int = 16) -> SynthesizerPool:
+    """Get or create the synthesizer pool for a Speech resource"""
+    with _pools_lock:
+        key = (subscription, region)
+        if key not in _pools:
+            _pools[key] = SynthesizerPool(subscription, region, max_per_voice, max_idle)
+        return _pools[key]
@@ -0,0 +1,264 @@
+"""
+TTS Backends for voiceover synthesis
+A small interface (synthesize with word boundaries and bookmarks, voices, warmup) with the
+Azure Speech implementation behind it, plus an offline deterministic backend for load tests
+"""
+
+import io
+import re
+import time
+import wave
+import hashlib
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, Any, List, Optional
+from xml.sax.saxutils import unescape as xml_unescape
+
+import numpy as np
+import azure.cognitiveservices.speech as speechsdk
+
+from app.utils.voices import VOICE_CATALOG
+from .synthesizer_pool import get_synthesizer_pool
+from .speech_limiter import AdaptiveLimiter, SpeechThrottled, get_speech_limiter, is_throttled
+
+logger = logging.getLogger(__name__)
+
+
+class SynthesisResult:
+    """Synthesized audio with its timing events"""
+    def __init__(self, audio: bytes, words: List[Dict[str, Any]], bookmarks: List[Dict[str, Any]]):
+        """
+        Args:
+            audio: 16-bit mono WAV bytes
+            words: Word timings, each {'text', 'start', 'end'} in seconds from the start of the audio
+            bookmarks: SSML bookmarks reached, each {'mark', 'offset'} in seconds
+        """
+        self.audio = audio
+        self.words = words
+        self.bookmarks = bookmarks
+
+
+class TTSBackend(ABC):
+    """Interface every TTS backend implements"""
+
+    # Backend name, and whether its output is worth keeping in the TTS cache
+    name = ''
+    cacheable = True
+
+    @abstractmethod
+    def synthesize(self, voice: str, text: str, ssml: bool = False) -> SynthesisResult:
+        """
+        Synthesize text (or an SSML document) with a voice
+
+        Raises:
+            Exception: If synthesis fails
+        """
+
+    def list_voices(self) -> Dict[str, Dict[str, str]]:
+        """Available voices: {voice_id: {'name', 'language', 'gender'}}"""
+        return VOICE_CATALOG
+
+    def warm(self, voice: str, count: int = 1):
+        """Prepare resources for upcoming syntheses with a voice (optional)"""
+        pass
+
+
+class AzureTTSBackend(TTSBackend):
+    """
+    Azure Speech synthesis through the shared pool of warm synthesizers, within the
+    process-wide adaptive speech concurrency limit (throttled calls are retried)
+    """
+
+    name = 'azure'
+
+    def __init__(self, subscription: str, region: str, max_per_voice: int = 4,
+                 limiter: Optional[AdaptiveLimiter] = None, max_idle: int = 16):
+        self.pool = get_synthesizer_pool(subscription, region, max_per_voice, max_idle)
+        self.limiter = limiter or get_speech_limiter()
+
+    def synthesize(self, voice: str, text: str, ssml: bool = False) -> SynthesisResult:
+        return self.limiter.call(lambda: self._synthesize_once(voice, text, ssml))
+
+    def _synthesize_once(self, voice: str, text: str, ssml: bool) -> SynthesisResult:
+        words = []
+        bookmarks = []
+
+        def on_word_boundary(evt):
+            # Offsets are in 100ns ticks; punctuation attaches to the word before it
+            if evt.boundary_type == speechsdk.SpeechSynthesisBoundaryType.Punctuation:
+                if words:
+                    words[-1]['text'] += evt.text
+                return
+            if evt.boundary_type == speechsdk.SpeechSynthesisBoundaryType.Word:
+                start = evt.audio_offset / 10000000
+                words.append({
+                    'text': evt.text,
+                    'start': start,
+                    'end': start + evt.duration.total_seconds()
+                })
+
+        def on_bookmark(evt):
+            bookmarks.append({'mark': evt.text, 'offset': evt.audio_offset / 10000000})
+
+        # Warm synthesizers from the shared pool; each is used by one synthesis at a time
+        with self.pool.synthesizer(voice) as synthesizer:
+            synthesizer.synthesis_word_boundary.connect(on_word_boundary)
+            if ssml:
+                synthesizer.bookmark_reached.connect(on_bookmark)
+                result = synthesizer.speak_ssml_async(text).get()
+            else:
+                result = synthesizer.speak_text_async(text).get()
+
+            if result.reason == speechsdk.ResultReason.Canceled:
+                cancellation = result.cancellation_details
+                if is_throttled(cancellation):
+                    raise SpeechThrottled(f"Speech synthesis throttled: {cancellation.error_details}")
+                raise Exception(f"Speech synthesis canceled: {cancellation.reason}. Error: {cancellation.error_details}")
+            elif result.reason != speechsdk.ResultReason.SynthesizingAudioCompleted:
+                raise Exception(f"Speech synthesis failed with reason: {result.reason}")
+
+        return SynthesisResult(result.audio_data, words, bookmarks)
+
+    def warm(self, voice: str, count: int = 1):
+        self.pool.warm(voice, count)
+
+
+class LocalTTSBackend(TTSBackend):
+    """
+    Offline deterministic backend for benchmarks and load tests
+
+    Renders every word as a short tone (pitch derived from the voice) with speech-like
+    durations and pauses, and reports word boundaries and bookmarks like Azure does.
+    The same input always produces the same audio.
+    """
+
+    name = 'local'
+    cacheable = False
+
+    SAMPLE_RATE = 16000
+    EDGE_SILENCE = (0.05, 0.1)   # leading/trailing silence, as real TTS output has
+    WORD_GAP = 0.06
+    CLAUSE_PAUSE = 0.25          # after , ; :
+    SENTENCE_PAUSE = 0.45        # after . ! ?
+
+    def __init__(self, latency: float = 0.0):
+        """
+        Args:
+            latency: Seconds each synthesis blocks for, to simulate network round trips
+        """
+        self.latency = latency
+
+    def _word_duration(self, word: str) -> float:
+        return 0.1 + 0.055 * len(word.strip('.,;:!?'))
+
+    def _tokens(self, text: str, ssml: bool):
+        """Split input into ('word', text), ('break', seconds) and ('bookmark', mark) tokens"""
+        if not ssml:
+            return [('word', word) for word in text.split()]
+
+        tokens = []
+        for part in re.split(r'(<[^>]+>)', text):
+            if part.startswith('<'):
+                mark = re.match(r'<bookmark\s+mark="([^"]*)"', part)
+                pause = re.match(r'<break\s+time="(\d+(?:\.\d+)?)(ms|s)"', part)
+                if mark:
+                    tokens.append(('bookmark', mark.group(1)))
+                elif pause:
+                    value = float(pause.group(1))
+                    tokens.append(('break', value / 1000 if pause.group(2) == 'ms' else value))
+            else:
+                tokens.extend(('word', word) for word in xml_unescape(part).split())
+        return tokens
+
+    def synthesize(self, voice: str, text: str, ssml: bool = False) -> SynthesisResult:
+        if self.latency:
+            time.sleep(self.latency)
+
+        rate = self.SAMPLE_RATE
+        pitch = 140 + int(hashlib.sha256(voice.encode('utf-8')).hexdigest()[:4], 16) % 160
+
+        chunks = [np.zeros(int(self.EDGE_SILENCE[0] * rate), dtype=np.float32)]
+        cursor = self.EDGE_SILENCE[0]
+        words = []
+        bookmarks = []
+
+        # Punctuation pauses are emitted lazily so bookmarks land right after the preceding word;
+        # explicit breaks are emitted at once
+        pending_pause = 0.0
+
+        def flush_pause():
+            nonlocal cursor, pending_pause
+            silence_samples = int(pending_pause * rate)
+            chunks.append(np.zeros(silence_samples, dtype=np.float32))
+            cursor += silence_samples / rate
+            pending_pause = 0.0
+
+        for kind, value in self._tokens(text, ssml):
+            if kind == 'bookmark':
+                bookmarks.append({'mark': value, 'offset': cursor})
+            elif kind == 'break':
+                pending_pause += value
+                flush_pause()
+            else:
+                flush_pause()
+                duration = self._word_duration(value)
+                samples = int(duration * rate)
+                t = np.arange(samples, dtype=np.float32) / rate
+                tone = 0.2 * np.sin(2 * np.pi * pitch * t).astype(np.float32)
+                # 10ms fades avoid clicks between words
+                fade = min(int(0.01 * rate), samples // 2)
+                if fade:
+                    ramp = np.linspace(0, 1, fade, dtype=np.float32)
+                    tone[:fade] *= ramp
+                    tone[-fade:] *= ramp[::-1]
+                chunks.append(tone)
+                words.append({'text': value, 'start': cursor, 'end': cursor + samples / rate})
+                cursor += samples / rate
+
+                if value[-1] in '.!?':
+                    pending_pause = self.SENTENCE_PAUSE
+                elif value[-1] in ',;:':
+                    pending_pause = self.CLAUSE_PAUSE
+                else:
+                    pending_pause = self.WORD_GAP
+
+        flush_pause()
+        chunks.append(np.zeros(int(self.EDGE_SILENCE[1] * rate), dtype=np.float32))
+        pcm = (np.concatenate(chunks) * 32767).astype('<i2').tobytes()
+
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(rate)
+            wav.writeframes(pcm)
+
+        return SynthesisResult(buffer.getvalue(), words, bookmarks)
+
+
+def get_tts_backend(config: Dict[str, Any]) -> Optional[TTSBackend]:
+    """
+    Create the configured TTS backend (video.tts_backend)
+
+    Returns:
+        Backend instance, or None when Azure is selected but not configured
+    """
+    video_config = config.get('video', {})
+    backend = video_config.get('tts_backend', 'azure')
+
+    if backend == 'local':
+        return LocalTTSBackend(latency=float(video_config.get('tts_local_latency', 0.0)))
+    if backend != 'azure':
+        raise ValueError(f"Unknown TTS backend: {backend}")
+
+    speech_key = config.get('azure', {}).get('speech_key', '')
+    if not speech_key:
+        return None
+    speech_region = config['azure'].get('speech_region', 'eastus')
+    return AzureTTSBackend(
+        speech_key,
+        speech_region,
+        int(video_config.get('tts_concurrency', 4)),
+        limiter=get_speech_limiter(config),
+        max_idle=int(config['azure'].get('synthesizer_pool_size', 16))
+    )
@@ -0,0 +1,161 @@
+"""
+TTS Cache for synthesized narration audio
+Content-addressed disk cache keyed by voice, normalized text, SSML options and audio format,
+with atomic writes and least-recently-used eviction by total size
+"""
+
+import os
+import json
+import hashlib
+import threading
+import unicodedata
+import logging
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Format voiceovers are synthesized in
+DEFAULT_AUDIO_FORMAT = 'riff-16khz-16bit-mono-pcm'
+
+
+def normalize_narration(text: str) -> str:
+    """Canonical form of narration text (Unicode NFC, collapsed whitespace)"""
+    return ' '.join(unicodedata.normalize('NFC', text or '').split())
+
+
+def tts_cache_key(voice: str, text: str, options: Optional[Dict[str, Any]] = None,
+                  audio_format: str = DEFAULT_AUDIO_FORMAT) -> str:
+    """
+    Cache key for a synthesis request
+
+    Args:
+        voice: Resolved voice ID (e.g. 'en-US-JennyNeural')
+        text: Narration text
+        options: SSML options affecting the audio (rate, pitch, bookmarks, ...)
+        audio_format: Output audio format
+
+    Returns:
+        Hex digest identifying the audio
+    """
+    payload = json.dumps({
+        'voice': voice,
+        'text': normalize_narration(text),
+        'options': options or {},
+        'format': audio_format
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class TTSCache:
+    """Disk cache of synthesized audio files, with optional JSON metadata per entry"""
+
+    def __init__(self, cache_dir: str, max_bytes: int = 1024 * 1024 * 1024, extension: str = 'wav'):
+        """
+        Initialize TTS cache
+
+        Args:
+            cache_dir: Directory holding cached audio
+            max_bytes: Total size the cache is trimmed to after each insert (0 = unbounded)
+            extension: File extension of cached audio
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.{self.extension}"
+
+    def _meta_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str, with_meta: bool = False):
+        """
+        Read cached audio
+
+        Args:
+            key: Cache key
+            with_meta: Also return the metadata stored with the audio; entries
+                without metadata then count as misses
+
+        Returns:
+            Audio bytes (or a (bytes, metadata) tuple with with_meta), or None on a cache miss
+        """
+        path = self._path(key)
+        try:
+            meta = None
+            if with_meta:
+                with open(self._meta_path(key), 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+            with open(path, 'rb') as f:
+                data = f.read()
+            # Touching the entry marks it as recently used
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+
+        logger.info(f"TTS cache hit: {key[:12]}")
+        return (data, meta) if with_meta else data
+
+    def put(self, key: str, data: bytes, meta: Optional[Dict[str, Any]] = None):
+        """
+        Store synthesized audio under key (atomic; concurrent writers of one key are safe)
+
+        Args:
+            key: Cache key
+            data: Audio bytes
+            meta: Optional JSON-serializable metadata (e.g. word boundaries), written before
+                the audio so a visible entry always has it
+        """
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        if meta is not None:
+            self._write_atomic(self._meta_path(key), json.dumps(meta, ensure_ascii=False).encode('utf-8'))
+        self._write_atomic(path, data)
+
+        if self.max_bytes:
+            self._evict()
+
+    def _write_atomic(self, path: Path, data: bytes):
+        partial_path = path.with_name(f"{path.name}.{os.urandom(4).hex()}.part")
+        try:
+            with open(partial_path, 'wb') as f:
+                f.write(data)
+            os.replace(partial_path, path)
+        finally:
+            if partial_path.exists():
+                partial_path.unlink()
+
+    def _evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        with self._lock:
+            entries = []
+            total = 0
+            for path in self.cache_dir.glob(f"*/*.{self.extension}"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+            if total <= self.max_bytes:
+                return
+
+            entries.sort(key=lambda entry: entry[0])
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    path.unlink()
+                    total -= size
+                except OSError:
+                    continue
+                meta_path = path.with_suffix('.json')
+                if meta_path.exists():
+                    meta_path.unlink()
+
+            logger.info(f"TTS cache trimmed to {total // (1024 * 1024)}MB")
@@ -4,10 +4,18 @@ Handles script generation, voiceover, video clips, and final composition
 """
 
 import os
-from typing import Dict, Any, List
+import json
+import hashlib
+from typing import Dict, Any, List, Union, Optional
 from pathlib import Path
 import tempfile
+import subprocess
+from xml.sax.saxutils import escape as xml_escape
+import time
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import azure.cognitiveservices.speech as speechsdk
 from pexels_api import API as PexelsAPI
 import logging
@@ -31,14 +39,31 @@ os.environ["FFMPEG_BINARY"] = imageio_ffmpeg.get_ffmpeg_exe()
 logger.info(f"Using ffmpeg: {imageio_ffmpeg.get_ffmpeg_exe()}")
 
 from moviepy import VideoFileClip, AudioFileClip, concatenate_videoclips, TextClip, CompositeVideoClip
-from moviepy.audio.AudioClip import CompositeAudioClip
+from moviepy.audio.AudioClip import CompositeAudioClip, AudioArrayClip
 from moviepy.video import fx as vfx
 from contextlib import ExitStack
 from .llm_service import LLMService
 from .subtitle_service import SubtitleService, SubtitleItem
+from app.models.timeline import Timeline, AudioTrack
+from .render_scheduler import get_render_scheduler, estimate_render_cost
+from .render_dedup import RenderDeduplicator, request_fingerprint, fingerprint_seed
+from .render_cancellation import RenderProgressLogger, kill_ffmpeg_processes, kill_clip_readers
+from .clip_probe import cached_probe
+from .tts_cache import TTSCache, tts_cache_key
+from .tts_backend import get_tts_backend
+from .clip_search_cache import get_clip_search_cache
+from .clip_providers import ClipProvider, get_clip_providers
+from .clip_library import get_clip_library
+from .speech_limiter import get_speech_limiter
+from app.utils.audio import wav_to_pcm, read_pcm, trim_silence, silence, pcm_duration, Voiceover
+from app.utils.i18n import get_text
 import random
 
 
+# Sample rate voiceovers are handed to the encoder at (MoviePy's default audio rate)
+VOICEOVER_FPS = 44100
+
+
 class VideoService:
     """Service for video generation operations"""
     
@@ -48,10 +73,61 @@ class VideoService:
         self.output_dir = Path(config['video'].get('output_dir', './output'))
         self.temp_dir = Path(config['video'].get('temp_dir', './temp'))
 
+        # Host-wide admission control for the CPU/memory heavy composition stage
+        self.scheduler = get_render_scheduler(config)
+
+        # Identical requests share one render
+        self.dedup = RenderDeduplicator(float(config.get('render', {}).get('dedup_window', 3600)))
+
         # Create directories
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.temp_dir.mkdir(parents=True, exist_ok=True)
 
+        # Optional shared caches (empty path = disabled)
+        clip_cache_dir = config['video'].get('clip_cache_dir', '')
+        self.clip_cache_dir = Path(clip_cache_dir) if clip_cache_dir else None
+        if self.clip_cache_dir:
+            self.clip_cache_dir.mkdir(parents=True, exist_ok=True)
+
+        script_cache_dir = config['video'].get('script_cache_dir', '')
+        self.script_cache_dir = Path(script_cache_dir) if script_cache_dir else None
+        if self.script_cache_dir:
+            self.script_cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # Process-wide limit on concurrent Azure speech calls, adapted to throttling
+        self.speech_limiter = get_speech_limiter(config)
+
+        # Stock footage search responses (video.search_cache; None = disabled)
+        self.search_cache = get_clip_search_cache(config)
+
+        # Local clip library searched before the remote providers (video.clip_library_dir)
+        self.clip_library = get_clip_library(config)
+
+        # Scene searches run concurrently over one keep-alive session
+        self.search_concurrency = max(1, int(config['video'].get('search_concurrency', 4)))
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=self.search_concurrency * 2)
+        self.http.mount('https://', adapter)
+
+        # Seconds the primary clip provider gets before a scene search is hedged to the next
+        self.search_hedge_delay = float(config['video'].get('search_hedge_delay', 2.0))
+        self._hedge_executor = ThreadPoolExecutor(max_workers=self.search_concurrency * 2)
+
+        # Voiceover synthesis (video.tts_backend: Azure, or the offline "local" backend)
+        self.tts_backend = get_tts_backend(config)
+
+        tts_cache_dir = config['video'].get('tts_cache_dir', '')
+        self.tts_cache = TTSCache(
+            tts_cache_dir,
+            max_bytes=int(config['video'].get('tts_cache_max_mb', 1024)) * 1024 * 1024
+        ) if tts_cache_dir and self.tts_backend and self.tts_backend.cacheable else None
+
+        # Voiceover synthesis: per-scene requests ("scenes") or one SSML request ("ssml"),
+        # scene narrations synthesized at once, and the pause placed between scenes
+        self.tts_mode = config['video'].get('tts_mode', 'scenes')
+        self.tts_concurrency = max(1, int(config['video'].get('tts_concurrency', 4)))
+        self.scene_pause = float(config['video'].get('scene_pause', 0.3))
+
         # Initialize Pexels API
         pexels_keys = self.config['app'].get('pexels_api_keys', [])
         self.pexels_api = PexelsAPI(pexels_keys[0]) if pexels_keys else None
@@ -61,10 +137,19 @@ class VideoService:
         speech_region = self.config['azure'].get('speech_region', 'eastus')
         if speech_key:
             self.speech_config = speechsdk.SpeechConfig(subscription=speech_key, region=speech_region)
-            self.subtitle_service = SubtitleService(self.speech_config)
         else:
             self.speech_config = None
-            self.subtitle_service = None
+        # Word-boundary subtitles work with any backend; recognition needs Azure
+        self.subtitle_service = SubtitleService(
+            self.speech_config,
+            self.speech_limiter,
+            chunk_seconds=float(config['video'].get('recognition_chunk_seconds', 30.0))
+        )
+        # Subtitles for audio without word timings: "recognition" (Azure, falling back to
+        # offline alignment) or "local" (always align the known narration offline)
+        self.subtitle_alignment = config['video'].get('subtitle_alignment', 'recognition')
+        # "burn" (rendered into the frames) or "soft" (muxed text track plus .srt/.vtt sidecars)
+        self.subtitle_mode = config['video'].get('subtitle_mode', 'burn')
     
     def generate_script(self, topic: str, duration: int, language: str = 'en') -> Dict[str, Any]:
         """
@@ -78,168 +163,385 @@ class VideoService:
         Returns:
             Script data with scenes and narration
         """
-        return self.llm_service.generate_script(topic, duration, language)
+        if not self.script_cache_dir:
+            return self.llm_service.generate_script(topic, duration, language)
+
+        # Identical topics share one script (batch runs and resumed batches)
+        normalized_topic = ' '.join(topic.lower().split())
+        key = hashlib.sha256(json.dumps([normalized_topic, duration, language]).encode('utf-8')).hexdigest()
+        cache_path = self.script_cache_dir / f"{key}.json"
+
+        if cache_path.exists():
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    logger.info(f"Script cache hit for topic: {topic[:50]}")
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable cached script {cache_path}: {e}")
+
+        script = self.llm_service.generate_script(topic, duration, language)
+
+        partial_path = cache_path.with_name(f"{cache_path.name}.{os.urandom(4).hex()}.part")
+        with open(partial_path, 'w', encoding='utf-8') as f:
+            json.dump(script, f, ensure_ascii=False)
+        os.replace(partial_path, cache_path)
+
+        return script
     
-    def generate_voiceover(self, script: Dict[str, Any], voice: str, language: str = 'en') -> str:
+    def generate_voiceover(self, script: Dict[str, Any], voice: str, language: str = 'en') -> Voiceover:
         """
         Generate voiceover audio from script using Azure TTS
 
+        With video.tts_mode = "scenes" (default) each scene's narration is synthesized
+        concurrently (up to video.tts_concurrency at once), trimmed of edge silence and
+        joined with video.scene_pause seconds between scenes. With "ssml" the whole
+        narration is one SSML request with a bookmark around every scene and
+        bookmark_reached events locate the scenes. Either way the start/end of every
+        scene in the track is stored in script['scene_timings'], and every spoken word
+        (from the synthesizer's word boundary events) in script['word_timings'] for subtitles.
+
         Args:
-            script: Script data with narration
+            script: Script data with scenes and narration
             voice: Voice ID (e.g., 'en-US-JennyNeural') or legacy type (male, female, neutral)
             language: Language code (used for legacy voice selection)
 
         Returns:
-            Path to generated audio file
+            Voiceover holding the narration track in memory
         """
-        audio_file = self.temp_dir / f"voiceover_{os.urandom(8).hex()}.wav"
-
-        if not self.speech_config:
+        if not self.tts_backend:
             raise Exception("Azure Speech Services not configured. Please add AZURE_SPEECH_KEY and AZURE_SPEECH_REGION.")
 
-        try:
-            # Check if voice is a full voice ID (contains 'Neural') or legacy type
-            if 'Neural' in voice or '-' in voice:
-                # Modern voice ID format (e.g., 'en-US-JennyNeural')
-                selected_voice = voice
+        selected_voice = self._resolve_voice(voice, language)
+        logger.info(f"Using voice: {selected_voice}")
+
+        scenes = script.get('scenes') or []
+        texts = [(scene.get('narration') or '').strip() for scene in scenes]
+        if not any(texts):
+            # Scripts without per-scene narration are read as one scene
+            texts = [(script.get('narration') or '').strip()]
+        if not any(texts):
+            raise Exception("No narration text found in script")
+
+        if self.tts_mode == 'ssml':
+            return self._generate_ssml_voiceover(script, selected_voice, texts)
+
+        # Synthesize scenes concurrently with a bounded number of synthesizers
+        workers = max(1, min(self.tts_concurrency, sum(1 for text in texts if text)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tts') as executor:
+            futures = [
+                executor.submit(self._synthesize, selected_voice, text) if text else None
+                for text in texts
+            ]
+            segments = [future.result() if future else None for future in futures]
+
+        # Join scenes with controlled pauses, recording where each scene and word lands
+        sample_rate = next(segment[1] for segment in segments if segment)
+        pcm_parts = []
+        scene_timings = []
+        word_timings = []
+        cursor = 0.0
+        for segment in segments:
+            if not segment:
+                scene_timings.append({'start': round(cursor, 3), 'end': round(cursor, 3)})
+                continue
+            if pcm_parts:
+                pcm_parts.append(silence(self.scene_pause, sample_rate))
+                cursor += self.scene_pause
+            pcm, lead = trim_silence(segment[0], segment[1])
+            duration = pcm_duration(pcm, sample_rate)
+            pcm_parts.append(pcm)
+            scene_timings.append({'start': round(cursor, 3), 'end': round(cursor + duration, 3)})
+            for word in segment[2]:
+                word_timings.append({
+                    'text': word['text'],
+                    'start': round(cursor + max(word['start'] - lead, 0.0), 3),
+                    'end': round(cursor + min(max(word['end'] - lead, 0.0), duration), 3)
+                })
+            cursor += duration
+
+        script['scene_timings'] = scene_timings
+        script['word_timings'] = word_timings
+        logger.info(f"Voiceover: {len(texts)} scene(s), {cursor:.1f}s")
+
+        return Voiceover(b''.join(pcm_parts), sample_rate)
+
+    def _generate_ssml_voiceover(self, script: Dict[str, Any], voice: str, texts: List[str]) -> Voiceover:
+        """Synthesize all scenes in one SSML request, timing scenes with bookmarks (see generate_voiceover)"""
+        locale = '-'.join(voice.split('-')[:2])
+        pause_ms = int(self.scene_pause * 1000)
+
+        parts = []
+        for idx, text in enumerate(texts):
+            if not text:
+                continue
+            if parts:
+                parts.append(f'<break time="{pause_ms}ms"/>')
+            parts.append(f'<bookmark mark="scene-{idx}"/>{xml_escape(text)}<bookmark mark="scene-{idx}-end"/>')
+
+        ssml = (
+            f'<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xml:lang="{locale}">'
+            f'<voice name="{voice}">{"".join(parts)}</voice></speak>'
+        )
+        pcm, sample_rate, words, bookmarks = self._synthesize(voice, ssml, ssml=True)
+        duration = pcm_duration(pcm, sample_rate)
+
+        marks = {bookmark['mark']: bookmark['offset'] for bookmark in bookmarks}
+        scene_timings = []
+        cursor = 0.0
+        for idx, text in enumerate(texts):
+            if text:
+                start = min(marks.get(f"scene-{idx}", cursor), duration)
+                end = min(marks.get(f"scene-{idx}-end", start), duration)
+                cursor = end
             else:
-                # Legacy format: male/female/neutral
-                voice_map = {
-                    'en': {'male': 'en-US-GuyNeural', 'female': 'en-US-JennyNeural', 'neutral': 'en-US-AriaNeural'},
-                    'zh': {'male': 'zh-CN-YunxiNeural', 'female': 'zh-CN-XiaoxiaoNeural', 'neutral': 'zh-CN-YunyangNeural'},
-                    'ar': {'male': 'ar-SA-HamedNeural', 'female': 'ar-SA-ZariyahNeural', 'neutral': 'ar-SA-HamedNeural'}
-                }
-                selected_voice = voice_map.get(language, voice_map['en']).get(voice, voice_map['en']['neutral'])
+                start = end = cursor
+            scene_timings.append({'start': round(start, 3), 'end': round(end, 3)})
+
+        script['scene_timings'] = scene_timings
+        script['word_timings'] = [
+            {'text': word['text'], 'start': round(word['start'], 3), 'end': round(min(word['end'], duration), 3)}
+            for word in words
+        ]
+        logger.info(f"SSML voiceover: {len(texts)} scene(s), {duration:.1f}s, {len(bookmarks)} bookmark(s)")
+
+        return Voiceover(pcm, sample_rate)
+
+    def _resolve_voice(self, voice: str, language: str = 'en') -> str:
+        """Map a voice ID or legacy voice type (male, female, neutral) to an Azure voice ID"""
+        # Check if voice is a full voice ID (contains 'Neural') or legacy type
+        if 'Neural' in voice or '-' in voice:
+            # Modern voice ID format (e.g., 'en-US-JennyNeural')
+            return voice
+
+        # Legacy format: male/female/neutral
+        voice_map = {
+            'en': {'male': 'en-US-GuyNeural', 'female': 'en-US-JennyNeural', 'neutral': 'en-US-AriaNeural'},
+            'zh': {'male': 'zh-CN-YunxiNeural', 'female': 'zh-CN-XiaoxiaoNeural', 'neutral': 'zh-CN-YunyangNeural'},
+            'ar': {'male': 'ar-SA-HamedNeural', 'female': 'ar-SA-ZariyahNeural', 'neutral': 'ar-SA-HamedNeural'}
+        }
+        return voice_map.get(language, voice_map['en']).get(voice, voice_map['en']['neutral'])
+
+    def _synthesize(self, voice: str, text: str, ssml: bool = False):
+        """
+        Synthesize narration text (or an SSML document) in memory with the configured
+        TTS backend, reusing the TTS cache when enabled
 
-            self.speech_config.speech_synthesis_voice_name = selected_voice
-            logger.info(f"Using voice: {selected_voice}")
-            
-            # Configure audio output
-            audio_config = speechsdk.audio.AudioOutputConfig(filename=str(audio_file))
-            synthesizer = speechsdk.SpeechSynthesizer(speech_config=self.speech_config, audio_config=audio_config)
-            
-            # Generate speech
-            narration_text = script.get('narration', '')
-            if not narration_text:
-                raise Exception("No narration text found in script")
-            
-            result = synthesizer.speak_text_async(narration_text).get()
-            
-            if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-                return str(audio_file)
-            elif result.reason == speechsdk.ResultReason.Canceled:
-                cancellation = result.cancellation_details
-                # Clean up partial file
-                if audio_file.exists():
-                    audio_file.unlink()
-                raise Exception(f"Speech synthesis canceled: {cancellation.reason}. Error: {cancellation.error_details}")
-            else:
-                # Clean up partial file
-                if audio_file.exists():
-                    audio_file.unlink()
-                raise Exception(f"Speech synthesis failed with reason: {result.reason}")
-        except Exception as e:
-            # Clean up on any error
-            if audio_file.exists():
-                audio_file.unlink()
-            raise
+        Returns:
+            Tuple of (16-bit mono PCM bytes, sample rate, word timings, bookmark offsets),
+            timings in seconds from the start of the synthesized audio
+        """
+        # Retries, re-renders and repeated scripts reuse earlier synthesis
+        cache_key = tts_cache_key(voice, text, options={'ssml': True} if ssml else None)
+        if self.tts_cache:
+            cached = self.tts_cache.get(cache_key, with_meta=True)
+            if cached:
+                meta = cached[1]
+                return wav_to_pcm(cached[0]) + (meta.get('words', []), meta.get('bookmarks', []))
+
+        result = self.tts_backend.synthesize(voice, text, ssml=ssml)
+
+        if self.tts_cache:
+            try:
+                self.tts_cache.put(cache_key, result.audio, meta={'words': result.words, 'bookmarks': result.bookmarks})
+            except OSError as e:
+                logger.warning(f"Failed to cache voiceover: {e}")
+        return wav_to_pcm(result.audio) + (result.words, result.bookmarks)
     
-    def search_video_clips(self, script: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def search_video_clips(self, script: Dict[str, Any], seed: int = None) -> List[Dict[str, Any]]:
         """
-        Search for video clips based on script scenes using Pexels REST API
+        Search for video clips based on script scenes in the local clip library, then the
+        stock footage providers (Pexels, Pixabay; video.clip_providers sets the priority)
+
+        Scenes are searched concurrently (video.search_concurrency) over one keep-alive
+        session; clips keep scene order and a failed scene search only skips that scene.
         
         Args:
             script: Script data with scenes
+            seed: Optional seed for a deterministic choice between equally relevant clips
         
         Returns:
             List of video clip metadata with download URLs
         """
-        clips = []
+        # Providers with API keys (requests rotate across each provider's keys by rate-limit headroom)
+        providers = get_clip_providers(self.config, self.http, self.search_cache)
+        if not providers and not self.clip_library:
+            raise Exception("No video source configured. Please add PEXELS_API_KEYS or PIXABAY_API_KEYS.")
         
-        # Get API key from config
-        pexels_keys = self.config['app'].get('pexels_api_keys', [])
-        if not pexels_keys:
-            raise Exception("Pexels API not configured. Please add PEXELS_API_KEYS.")
+        scenes = [
+            (idx, scene.get('description', '')[:100])  # Limit query length
+            for idx, scene in enumerate(script.get('scenes', []))
+        ]
+        scenes = [(idx, query) for idx, query in scenes if query]
         
-        api_key = pexels_keys[0]
-        base_url = "https://api.pexels.com/videos/search"
+        # Search cache outcome of every provider search in this call (True = hit)
+        cache_lookups = []
         
-        for idx, scene in enumerate(script.get('scenes', [])):
-            query = scene.get('description', '')[:100]  # Limit query length
-            if not query:
-                continue
-            
+        def search_scene(scene):
+            idx, query = scene
             try:
-                # Search for videos using Pexels REST API
-                headers = {'Authorization': api_key}
-                params = {
-                    'query': query,
-                    'per_page': 3,
-                    'page': 1,
-                    'orientation': 'landscape'
-                }
-                
-                response = requests.get(base_url, headers=headers, params=params, timeout=10)
-                response.raise_for_status()
-                data = response.json()
-                
-                videos = data.get('videos', [])
-                
-                if videos:
-                    # Try each video until we find one with valid files
-                    for video in videos:
-                        video_files = video.get('video_files', [])
-                        
-                        if not video_files:
-                            continue
-                        
-                        # Find the best quality video file (prefer HD, highest bitrate)
-                        best_file = None
-                        best_score = 0
-                        
-                        for vf in video_files:
-                            width = vf.get('width', 0)
-                            quality = vf.get('quality', '')
-                            
-                            # Score: HD quality + higher resolution
-                            score = (1000 if quality == 'hd' else 0) + width
-                            
-                            if score > best_score and width >= 1280:
-                                best_file = vf
-                                best_score = score
-                        
-                        # Fallback to first available file if no HD found
-                        if not best_file and video_files:
-                            best_file = video_files[0]
-                        
-                        if best_file:
-                            clip = {
-                                'id': video.get('id', f"clip_{idx}"),
-                                'url': best_file.get('link', ''),
-                                'description': query,
-                                'duration': video.get('duration', 5),
-                                'width': best_file.get('width', 1920),
-                                'height': best_file.get('height', 1080),
-                                'source': 'pexels'
-                            }
-                            
-                            if clip['url']:
-                                clips.append(clip)
-                                break  # Found a good clip for this scene
-                        
+                return self._clip_for_scene(idx, query, providers, seed, cache_lookups)
             except Exception as e:
                 print(f"Warning: Failed to fetch clip for scene {idx}: {str(e)}")
-                continue
+                return None
+        
+        if scenes:
+            with ThreadPoolExecutor(max_workers=min(self.search_concurrency, len(scenes))) as executor:
+                clips = [clip for clip in executor.map(search_scene, scenes) if clip]
+        else:
+            clips = []
+        
+        if self.search_cache:
+            hits = sum(cache_lookups)
+            logger.info(
+                f"Clip search cache: {hits} hits, {len(cache_lookups) - hits} misses for this job "
+                f"(process totals: {self.search_cache.stats()})"
+            )
+        for provider in providers:
+            logger.info(f"{provider.name} key usage: {provider.key_pool.usage()}")
         
         if not clips:
             raise Exception("Could not find any suitable video clips for the script scenes")
         
         return clips
     
+    def _clip_for_scene(self, idx: int, query: str, providers: List[ClipProvider],
+                        seed: int = None, cache_lookups: Optional[List[bool]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Find a clip for one scene: from the local library, else hedging across providers
+
+        A library clip matching the query is used without any network call. Otherwise the
+        primary provider is asked first. If it has not answered within
+        video.search_hedge_delay seconds of its search starting (time queued behind other
+        renders' searches doesn't count), or fails, or finds nothing, the next provider is
+        asked too. Results are preferred in provider order: a backup's clip is only used
+        once every provider ahead of it has finished without one, or has still not
+        answered a further hedge delay later, so the choice stays the same from run to run
+        whenever providers answer within the window.
+        
+        Returns:
+            Video clip metadata, or None when no provider found a usable clip
+        """
+        if self.clip_library:
+            clip = self.clip_library.find_clip(query, idx, seed)
+            if clip:
+                return clip
+        if not providers:
+            return None
+
+        def search(provider, started):
+            started.set()
+            return self._pick_clip(provider.search(query, cache_lookups), idx, query, provider.name)
+        
+        futures = []  # In provider priority order
+        remaining = list(providers)
+        
+        def launch():
+            started = threading.Event()
+            future = self._hedge_executor.submit(search, remaining.pop(0), started)
+            futures.append(future)
+            # The hedge clock starts when the search runs, not while it waits for a thread
+            while not started.wait(timeout=1.0) and not future.done():
+                pass
+        
+        def clip_of(future):
+            return future.result() if future.exception() is None else None
+        
+        launch()
+        grace_deadline = None
+        while True:
+            pending = [future for future in futures if not future.done()]
+            
+            # The best clip: the first in provider order, once every provider ahead has finished
+            for future in futures:
+                if not future.done():
+                    break
+                if clip_of(future):
+                    return clip_of(future)
+            else:
+                # Everything launched finished without a clip
+                if remaining:
+                    launch()
+                    continue
+                errors = [future.exception() for future in futures if future.exception() is not None]
+                if errors:
+                    raise errors[-1]
+                return None
+            
+            answered = [future for future in futures if future.done() and clip_of(future)]
+            if answered:
+                # A backup has a clip while a preferred provider is still searching: give
+                # that provider one more hedge delay before settling for the backup
+                grace_deadline = grace_deadline or time.monotonic() + self.search_hedge_delay
+                timeout = grace_deadline - time.monotonic()
+                if timeout <= 0:
+                    return clip_of(answered[0])
+                wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                continue
+            
+            # Wait for the hedge delay while backups remain, else for any answer
+            done, _ = wait(pending, timeout=self.search_hedge_delay if remaining else None,
+                           return_when=FIRST_COMPLETED)
+            if not done and remaining:
+                logger.info(f"Hedging scene {idx} search with {remaining[0].name}")
+                launch()
+    
+    def _pick_clip(self, videos: List[Dict[str, Any]], idx: int, query: str, source: str) -> Optional[Dict[str, Any]]:
+        """
+        Pick a clip for one scene from its search results
+        
+        Results are taken in the provider's relevance order, which is already
+        deterministic for a given query (so identical requests pick identical clips).
+        
+        Returns:
+            Video clip metadata, or None when no result has a usable file
+        """
+        # Try each video until we find one with valid files
+        for video in videos:
+            video_files = video.get('video_files', [])
+            
+            if not video_files:
+                continue
+            
+            # Find the best quality video file (prefer HD, highest bitrate)
+            best_file = None
+            best_score = 0
+            
+            for vf in video_files:
+                width = vf.get('width', 0)
+                quality = vf.get('quality', '')
+                
+                # Score: HD quality + higher resolution
+                score = (1000 if quality == 'hd' else 0) + width
+                
+                if score > best_score and width >= 1280:
+                    best_file = vf
+                    best_score = score
+            
+            # Fallback to first available file if no HD found
+            if not best_file and video_files:
+                best_file = video_files[0]
+            
+            if best_file:
+                clip = {
+                    'id': video.get('id', f"clip_{idx}"),
+                    'url': best_file.get('link', ''),
+                    'description': query,
+                    'duration': video.get('duration', 5),
+                    'width': best_file.get('width', 1920),
+                    'height': best_file.get('height', 1080),
+                    'source': source,
+                    'scene_index': idx
+                }
+                
+                if clip['url']:
+                    return clip  # Found a good clip for this scene
+        
+        return None
+
     def compose_video(
         self,
         clips: List[Dict[str, Any]],
-        audio_path: str,
+        voiceover: Union[Voiceover, str],
         script: Dict[str, Any],
         subtitle_position: str = 'bottom',
         quality: str = 'basic',
@@ -248,29 +550,68 @@ class VideoService:
         music_path: str = None,
         aspect_ratio: str = '16:9',
         clip_duration: int = 5,
-        progress_callback=None
+        threads: int = 4,
+        progress_callback=None,
+        cancel_token=None,
+        scene_timings: Optional[List[Dict[str, float]]] = None,
+        align_scenes: bool = False
     ) -> str:
         """
         Compose final video from clips and audio using MoviePy
 
         Args:
             clips: List of video clip data with URLs
-            audio_path: Path to voiceover audio file
-            script: Script data (unused for now)
+            voiceover: In-memory Voiceover (or path to an external voiceover audio file)
+            script: Script data (language and narration for subtitles); receives the render's
+                timeline (edit decision list) in script['timeline']
             subtitle_position: Subtitle position (unused for now)
             quality: Video quality setting (basic, hd, premium)
             music: Background music flag (unused for now)
+            threads: Encoder threads for ffmpeg
             progress_callback: Optional callback function to report progress (progress, message)
+            cancel_token: Optional CancellationToken checked between steps and on every frame
+            scene_timings: Optional start/end of each script scene in the voiceover (used to
+                align subtitles, and clips with align_scenes)
+            align_scenes: Cut each clip to exactly its scene's span in the voiceover instead of
+                uniform clip_duration cuts (when every clip carries a scene_index)
 
         Returns:
             Path to final video file
         """
         output_file = self.output_dir / f"video_{os.urandom(8).hex()}.mp4"
+        temp_audio_file = self.temp_dir / f"{output_file.stem}_audio.m4a"
         downloaded_clips = []
+        clip_scenes = []
+        clip_probes = {}
+        temp_clips = []
+        soft_subtitles = None
+        completed = False
+
+        def check_cancelled():
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
 
         logger.info(f"Starting video composition with {len(clips)} clips")
 
         with ExitStack() as stack:
+            # MoviePy clips this render opened (their ffmpeg readers are killed on cancel)
+            readers = []
+
+            def open_reader(clip):
+                readers.append(clip)
+                return stack.enter_context(clip)
+
+            def kill_render_processes():
+                # Cached and library clips are shared with other renders, so only files
+                # private to this render are matched by path; shared clips' readers are
+                # found through this render's own clip objects
+                kill_ffmpeg_processes([output_file, temp_audio_file] + temp_clips)
+                kill_clip_readers(readers)
+
+            # Cancelling from another thread kills the ffmpeg readers/encoder immediately
+            if cancel_token:
+                stack.callback(cancel_token.on_cancel(kill_render_processes))
+
             try:
                 # Step 1: Download video clips
                 logger.info("Step 1: Downloading video clips...")
@@ -278,38 +619,44 @@ class VideoService:
                     progress_callback(61, f"Downloading {len(clips)} video clips...")
 
                 for i, clip in enumerate(clips):
-                    clip_path = self.temp_dir / f"clip_{i}_{os.urandom(4).hex()}.mp4"
+                    check_cancelled()
                     try:
                         logger.info(f"Downloading clip {i+1}/{len(clips)} from {clip['url'][:50]}...")
                         if progress_callback:
                             progress_callback(61 + (i * 3 // len(clips)), f"Downloading clip {i+1}/{len(clips)}...")
 
-                        response = requests.get(clip['url'], stream=True, timeout=30)
-                        response.raise_for_status()
-
-                        with open(clip_path, 'wb') as f:
-                            for chunk in response.iter_content(chunk_size=8192):
-                                f.write(chunk)
-
+                        clip_path, is_temp = self._download_clip(clip, i)
                         logger.info(f"Downloaded clip {i+1} to {clip_path} ({clip_path.stat().st_size} bytes)")
+                        if is_temp:
+                            temp_clips.append(clip_path)
+                        # Unreadable files are dropped here, before any decoder is opened
+                        clip_probes[str(clip_path)] = cached_probe(str(clip_path), persist=not is_temp)
                         downloaded_clips.append(clip_path)
+                        clip_scenes.append(clip.get('scene_index'))
                     except Exception as e:
-                        logger.warning(f"Failed to download clip {i}: {str(e)}")
+                        logger.warning(f"Failed to download or probe clip {i}: {str(e)}")
                         continue
 
                 if not downloaded_clips:
                     raise Exception("Failed to download any video clips")
 
+                check_cancelled()
+
                 # Step 2: Load audio to get duration
-                logger.info("Step 2: Loading audio file...")
+                logger.info("Step 2: Loading audio...")
                 if progress_callback:
                     progress_callback(65, "Loading audio file...")
 
-                audio_clip = stack.enter_context(AudioFileClip(audio_path))
+                if isinstance(voiceover, Voiceover):
+                    # Straight from synthesis memory, resampled to the encoder's audio rate
+                    samples = voiceover.to_array(VOICEOVER_FPS)
+                    # with_duration also sets the clip's end, which CompositeAudioClip needs
+                    audio_clip = AudioArrayClip(samples, fps=VOICEOVER_FPS).with_duration(len(samples) / VOICEOVER_FPS)
+                else:
+                    audio_clip = open_reader(AudioFileClip(voiceover))
                 total_audio_duration = audio_clip.duration
                 logger.info(f"Audio loaded. Duration: {total_audio_duration}s")
 
-                # Step 3: Load and process video clips
                 # Set resolution based on aspect ratio and quality
                 if aspect_ratio == '9:16':
                     # Vertical (portrait)
@@ -318,67 +665,76 @@ class VideoService:
                     # Horizontal (landscape) - default 16:9
                     target_resolution = (1920, 1080) if quality in ['hd', 'premium'] else (1280, 720)
 
-                video_clips = []
-
-                logger.info(f"Step 3: Loading {len(downloaded_clips)} video clips...")
+                # Step 3: Plan the timeline from the probes, then load only the clips it uses
+                logger.info("Step 3: Planning clip durations...")
                 if progress_callback:
-                    progress_callback(68, f"Loading and processing {len(downloaded_clips)} video clips...")
-
-                for idx, clip_path in enumerate(downloaded_clips):
-                    try:
-                        logger.info(f"Loading clip {idx+1}/{len(downloaded_clips)}: {clip_path} ({clip_path.stat().st_size} bytes)")
+                    progress_callback(68, "Planning clip durations...")
+
+                video_items = [(str(clip_path), scene) for clip_path, scene in zip(downloaded_clips, clip_scenes)]
+                clips_by_source = {}
+                while True:
+                    timeline = self._plan_timeline(
+                        video_items, clip_probes, target_resolution, subtitle_position,
+                        total_audio_duration, clip_duration, scene_timings if align_scenes else None
+                    )
+
+                    check_cancelled()
+
+                    logger.info(f"Loading {len(timeline.sources)} video clips...")
+                    # Load the clips the plan uses; a clip MoviePy can't open is dropped and
+                    # the timeline re-planned without it
+                    failed = set()
+                    for idx, source in enumerate(timeline.sources):
+                        if source in clips_by_source:
+                            continue
+                        check_cancelled()
                         if progress_callback:
-                            progress_callback(68 + (idx * 5 // len(downloaded_clips)), f"Processing clip {idx+1}/{len(downloaded_clips)}...")
-
-                        video = stack.enter_context(VideoFileClip(str(clip_path)))
-                        logger.info(f"Clip {idx+1} loaded. Duration: {video.duration}s, Size: {video.size}")
-                        # Resize to target resolution
-                        logger.info(f"Resizing clip {idx+1} to {target_resolution}...")
-                        video = video.resized(target_resolution)
-                        video_clips.append(video)
-                        logger.info(f"Clip {idx+1} resized successfully")
-                    except Exception as e:
-                        logger.error(f"Failed to load clip {clip_path}: {str(e)}")
-                        import traceback
-                        traceback.print_exc()
-                        continue
-
-                if not video_clips:
-                    raise Exception(f"Failed to load any video clips. Downloaded {len(downloaded_clips)} files but none could be loaded by MoviePy.")
+                            progress_callback(70 + (idx * 4 // len(timeline.sources)), f"Processing clip {idx+1}/{len(timeline.sources)}...")
+                        probe = timeline.sources[source]
+                        try:
+                            video = open_reader(VideoFileClip(source))
+                            logger.info(f"Clip {idx+1} loaded. Duration: {probe.duration}s, Size: {probe.width}x{probe.height}, Codec: {probe.codec}")
+                            clips_by_source[source] = video.resized(target_resolution)
+                        except Exception as e:
+                            logger.error(f"Failed to load clip {source}: {str(e)}")
+                            import traceback
+                            traceback.print_exc()
+                            failed.add(source)
+
+                    if not failed:
+                        break
+                    video_items = [item for item in video_items if item[0] not in failed]
+                    if not video_items:
+                        raise Exception(f"Failed to load any video clips. Downloaded {len(downloaded_clips)} files but none could be loaded by MoviePy.")
+                    logger.info(f"Re-planning the timeline without {len(failed)} unloadable clip(s)")
+
+                check_cancelled()
 
                 # Step 4: Adjust clip durations to match audio
                 logger.info("Step 4: Adjusting clip durations...")
                 if progress_callback:
                     progress_callback(74, "Adjusting clip durations...")
 
-                # Use user-specified clip duration (with bounds)
-                target_clip_duration = max(2, min(clip_duration, total_audio_duration / len(video_clips)))
-                clips_needed = int(total_audio_duration / target_clip_duration) + 1
-                logger.info(f"Target clip duration: {target_clip_duration}s, clips needed: {clips_needed}")
-
                 adjusted_clips = []
-                clip_index = 0
-
-                # Cycle through available clips to fill the duration
-                for i in range(clips_needed):
-                    video = video_clips[clip_index % len(video_clips)]
-                    clip_index += 1
-
-                    logger.info(f"Adjusting clip {i+1}/{clips_needed} (current duration: {video.duration}s)")
+                for i, segment in enumerate(timeline.segments):
+                    video = clips_by_source[segment.source]
+                    cut_duration = segment.duration
+                    source_duration = timeline.sources[segment.source].duration
+                    logger.info(f"Adjusting clip {i+1}/{len(timeline.segments)} (current duration: {source_duration}s)")
                     if progress_callback:
-                        progress_callback(74 + (i * 3 // clips_needed), f"Adjusting clip {i+1}/{clips_needed}...")
+                        progress_callback(74 + (i * 3 // len(timeline.segments)), f"Adjusting clip {i+1}/{len(timeline.segments)}...")
 
-                    if video.duration > target_clip_duration:
+                    if source_duration > cut_duration:
                         # Trim if too long
-                        adjusted = video.subclipped(0, target_clip_duration)
-                        logger.info(f"Trimmed clip {i+1} to {target_clip_duration}s")
+                        adjusted = video.subclipped(0, cut_duration)
+                        logger.info(f"Trimmed clip {i+1} to {cut_duration:.2f}s")
                     else:
                         # Loop if too short - manually concatenate copies
-                        loops_needed = int(target_clip_duration / video.duration) + 1
+                        loops_needed = int(cut_duration / source_duration) + 1
                         logger.info(f"Looping clip {i+1} {loops_needed} times")
                         looped = concatenate_videoclips([video] * loops_needed)
-                        adjusted = looped.subclipped(0, target_clip_duration)
-                        logger.info(f"Looped and trimmed clip {i+1} to {target_clip_duration}s")
+                        adjusted = looped.subclipped(0, cut_duration)
+                        logger.info(f"Looped and trimmed clip {i+1} to {cut_duration:.2f}s")
 
                     adjusted_clips.append(adjusted)
 
@@ -390,18 +746,23 @@ class VideoService:
                 final_video = concatenate_videoclips(adjusted_clips, method="compose")
                 logger.info("Clips concatenated successfully")
 
+                check_cancelled()
+
                 # Step 6: Add audio
                 logger.info("Step 6: Adding audio to video...")
                 if progress_callback:
                     progress_callback(82, "Adding voiceover audio...")
 
+                voiceover_source = None if isinstance(voiceover, Voiceover) else str(voiceover)
+                timeline.audio_tracks.append(AudioTrack('voiceover', voiceover_source, 0.0, total_audio_duration))
+
                 # Mix voiceover with background music if enabled
                 if music_enabled and music_volume > 0 and music_path:
                     try:
                         logger.info(f"Adding background music from: {music_path}")
 
                         # Load music and adjust to video duration
-                        music_clip = stack.enter_context(AudioFileClip(music_path))
+                        music_clip = open_reader(AudioFileClip(music_path))
 
                         # Loop or trim music to match video duration
                         if music_clip.duration < total_audio_duration:
@@ -417,6 +778,9 @@ class VideoService:
                         # Composite audio: voiceover + background music
                         mixed_audio = CompositeAudioClip([audio_clip, music_clip])
                         final_video = final_video.with_audio(mixed_audio)
+                        timeline.audio_tracks.append(
+                            AudioTrack('music', str(music_path), 0.0, total_audio_duration, volume=music_volume, loop=True)
+                        )
                         logger.info("Background music added successfully")
 
                     except Exception as e:
@@ -435,25 +799,35 @@ class VideoService:
                         progress_callback(83, "Generating subtitles...")
 
                     try:
-                        # Generate subtitles from audio
-                        # Map language names to codes
-                        language_map = {'en': 'en', 'zh': 'zh', 'ar': 'ar', 'english': 'en', 'chinese': 'zh', 'arabic': 'ar'}
-                        lang = script.get('language', 'en').lower()
-                        lang_code = language_map.get(lang, 'en')
-                        subtitles = self.subtitle_service.generate_subtitles(audio_path, lang_code)
-
-                        if subtitles:
-                            logger.info(f"Generated {len(subtitles)} subtitle segments")
+                        if script.get('word_timings'):
+                            # Timings are known from synthesis; no recognition pass needed
+                            subtitles = self.subtitle_service.build_subtitles_from_word_boundaries(script['word_timings'])
+                        else:
+                            # Map language names to codes
+                            language_map = {'en': 'en', 'zh': 'zh', 'ar': 'ar', 'english': 'en', 'chinese': 'zh', 'arabic': 'ar'}
+                            lang = script.get('language', 'en').lower()
+                            lang_code = language_map.get(lang, 'en')
+                            subtitles = self._subtitles_without_timings(voiceover, script, lang_code, scene_timings)
+
+                        timeline.subtitles = subtitles or []
+                        if timeline.subtitles and self.subtitle_mode == 'soft':
+                            # Muxed as a text track after encoding; no compositing pass
+                            logger.info(f"Generated {len(timeline.subtitles)} subtitle segments (soft track)")
+                            soft_subtitles = timeline.subtitles
+                        elif timeline.subtitles:
+                            logger.info(f"Generated {len(timeline.subtitles)} subtitle segments")
                             if progress_callback:
                                 progress_callback(84, "Adding subtitles to video...")
 
                             # Add subtitle overlays to video
-                            final_video = self._add_subtitles_to_video(final_video, subtitles, subtitle_position)
+                            final_video = self._add_subtitles_to_video(final_video, timeline.subtitles, timeline.subtitle_position)
                             logger.info("Subtitles added successfully")
                     except Exception as e:
                         logger.warning(f"Failed to generate subtitles: {e}")
                         # Continue without subtitles
 
+                check_cancelled()
+
                 # Step 7: Set quality parameters
                 quality_settings = {
                     'basic': {'bitrate': '1000k', 'audio_bitrate': '128k'},
@@ -476,10 +850,12 @@ class VideoService:
                     audio_codec='aac',
                     bitrate=settings['bitrate'],
                     audio_bitrate=settings['audio_bitrate'],
-                    fps=24,
+                    fps=timeline.fps,
                     preset='ultrafast',  # Changed from 'medium' to 'ultrafast' for faster encoding
-                    threads=4,  # Increased from 2 to 4 for faster processing
-                    logger='bar'  # Show progress bar
+                    threads=threads,
+                    temp_audiofile=str(temp_audio_file),
+                    # Reports encode progress and aborts between frames once cancelled
+                    logger=RenderProgressLogger(cancel_token, progress_callback)
                 )
                 logger.info("Video file written successfully")
 
@@ -499,17 +875,306 @@ class VideoService:
                 if not output_file.exists():
                     raise Exception(f"Video file was not created at {output_file}")
 
+                if soft_subtitles:
+                    self._attach_soft_subtitles(output_file, soft_subtitles, script.get('language', 'en'))
+
                 logger.info(f"Video successfully created at: {output_file} (size: {output_file.stat().st_size} bytes)")
+                logger.info(f"Timeline: {timeline}")
+                script['timeline'] = timeline.to_dict()
+                completed = True
                 return str(output_file)
 
             finally:
-                # Always clean up downloaded temp files
-                for clip_path in downloaded_clips:
+                # Always clean up downloaded temp files (cached clips are kept for reuse)
+                for clip_path in temp_clips:
                     try:
                         clip_path.unlink()
                     except:
                         pass
 
+                # Remove partial outputs of failed or cancelled renders
+                partial_files = [temp_audio_file] if completed else [
+                    temp_audio_file, output_file, output_file.with_suffix('.srt'), output_file.with_suffix('.vtt')
+                ]
+                for partial_path in partial_files:
+                    try:
+                        if partial_path.exists():
+                            partial_path.unlink()
+                    except:
+                        pass
+
+    def _download_clip(self, clip: Dict[str, Any], index: int):
+        """
+        Download a clip, reusing the shared clip cache when enabled
+
+        Args:
+            clip: Video clip data with URL
+            index: Clip position (used for temp file naming)
+
+        Returns:
+            Tuple of (local path, whether the file is temporary and should be deleted)
+        """
+        if clip.get('local_path'):
+            # Clip library files are used in place
+            return Path(clip['local_path']), False
+
+        if self.clip_cache_dir:
+            cached_path = self.clip_cache_dir / f"{hashlib.sha256(clip['url'].encode('utf-8')).hexdigest()}.mp4"
+            if cached_path.exists():
+                logger.info(f"Clip cache hit for clip {index+1}")
+                return cached_path, False
+            target_path, is_temp = cached_path, False
+        else:
+            target_path, is_temp = self.temp_dir / f"clip_{index}_{os.urandom(4).hex()}.mp4", True
+
+        response = requests.get(clip['url'], stream=True, timeout=30)
+        response.raise_for_status()
+
+        # Write to a private file first so concurrent renders never see a partial clip
+        partial_path = target_path.with_name(f"{target_path.name}.{os.urandom(4).hex()}.part")
+        try:
+            with open(partial_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=8192):
+                    f.write(chunk)
+            os.replace(partial_path, target_path)
+        finally:
+            if partial_path.exists():
+                partial_path.unlink()
+
+        return target_path, is_temp
+
+    def generate_video(self, params: Dict[str, Any], progress_callback=None, cancel_token=None) -> Dict[str, Any]:
+        """
+        Run the full generation pipeline: script, voiceover, clip search and composition
+
+        Args:
+            params: Generation parameters (topic, duration, voice, language, quality,
+                aspect_ratio, clip_duration, align_scenes, subtitle_position, music_enabled,
+                music_volume, music_path, custom_script, lane)
+            progress_callback: Optional callback function to report progress (progress, message)
+            cancel_token: Optional CancellationToken; cancelling raises RenderCancelled
+
+        Identical requests (same fingerprint) share one render while in flight and reuse
+        the finished video within the render.dedup_window.
+
+        Returns:
+            Dictionary with the final video path and the script used
+        """
+        fingerprint = request_fingerprint(params)
+
+        def on_wait():
+            if progress_callback:
+                progress_callback(20, "An identical video is already being generated, waiting for it...")
+
+        return self.dedup.run(
+            fingerprint,
+            lambda: self._render_video(params, progress_callback, fingerprint, cancel_token),
+            on_wait=on_wait,
+            lane=params.get('lane', 'credit')
+        )
+
+    def _render_video(self, params: Dict[str, Any], progress_callback=None,
+                      fingerprint: str = None, cancel_token=None) -> Dict[str, Any]:
+        """Run the generation pipeline for one request (see generate_video)"""
+        def report(progress, message):
+            # Every stage boundary reports progress, so it doubles as a cancellation point
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
+            if progress_callback:
+                progress_callback(progress, message)
+
+        # Identical requests pick the same clips
+        seed = fingerprint_seed(fingerprint) if fingerprint else None
+
+        topic = params.get('topic', '')
+        language = params.get('language', 'en')
+        custom_script = params.get('custom_script')
+
+        # Connect synthesizers for the voice while the script is being written
+        if self.tts_backend:
+            voice = self._resolve_voice(params.get('voice', 'neutral'), language)
+            threading.Thread(
+                target=self.tts_backend.warm, args=(voice, self.tts_concurrency), daemon=True
+            ).start()
+
+        # Step 1: Generate or use custom script
+        if custom_script:
+            report(10, "Using custom script...")
+            script = {
+                'narration': custom_script,
+                'scenes': [{'description': topic or 'Custom video', 'narration': custom_script}],
+                'scene_count': 1,
+                'language': language
+            }
+        else:
+            report(10, get_text('video.generating_script', language))
+            script = self.generate_script(topic, params.get('duration', 60), language)
+            script['language'] = language
+
+        # Step 2: Generate voiceover
+        report(30, get_text('video.generating_voice', language))
+        voiceover = self.generate_voiceover(script, params.get('voice', 'neutral'), language)
+
+        # Step 3: Search for video clips
+        report(50, get_text('video.searching_clips', language))
+        clips = self.search_video_clips(script, seed=seed)
+
+        # Step 4: Wait for host capacity, then compose video (with detailed progress updates)
+        quality = params.get('quality', 'basic')
+        aspect_ratio = params.get('aspect_ratio', '16:9')
+        cost = estimate_render_cost(quality, params.get('duration', 60), aspect_ratio)
+
+        def on_wait(eta, position):
+            report(55, f"Waiting for render capacity ({position} ahead, ~{int(eta)}s)...")
+
+        # Identical requests joining from a higher lane raise this render's admission lane
+        joined_lanes = (lambda: self.dedup.joined_lanes(fingerprint)) if fingerprint else None
+        with self.scheduler.admit(cost, on_wait=on_wait, lane=params.get('lane', 'credit'),
+                                  joined_lanes=joined_lanes):
+            report(60, get_text('video.composing', language))
+            video_path = self.compose_video(
+                clips=clips,
+                voiceover=voiceover,
+                script=script,
+                subtitle_position=params.get('subtitle_position', 'bottom'),
+                quality=quality,
+                music_enabled=params.get('music_enabled', False),
+                music_volume=params.get('music_volume', 0.0),
+                music_path=params.get('music_path'),
+                aspect_ratio=aspect_ratio,
+                clip_duration=params.get('clip_duration', 5),
+                threads=cost.threads,
+                progress_callback=progress_callback,
+                cancel_token=cancel_token,
+                scene_timings=script.get('scene_timings'),
+                align_scenes=bool(params.get('align_scenes', False))
+            )
+
+        return {'video_path': video_path, 'script': script}
+
+    def _subtitles_without_timings(self, voiceover, script: Dict[str, Any], language: str,
+                                   scene_timings: Optional[List[Dict[str, float]]]) -> List[SubtitleItem]:
+        """
+        Subtitles for a voiceover without word timings
+
+        Recognizes the audio with Azure Speech, or aligns the known narration to it offline
+        with video.subtitle_alignment = "local", when Azure is not configured, or when
+        recognition fails.
+        """
+        if isinstance(voiceover, Voiceover):
+            pcm, sample_rate = voiceover.pcm, voiceover.sample_rate
+        else:
+            pcm, sample_rate = read_pcm(str(voiceover))
+
+        if self.subtitle_alignment != 'local' and self.speech_config:
+            try:
+                return self.subtitle_service.generate_subtitles_from_pcm(pcm, sample_rate, language)
+            except Exception as e:
+                logger.warning(f"Speech recognition failed, aligning narration locally: {e}")
+
+        texts = [(scene.get('narration') or '').strip() for scene in script.get('scenes', [])]
+        spans = None
+        if scene_timings and len(scene_timings) == len(texts):
+            spans = [(timing['start'], timing['end']) for timing in scene_timings]
+        if not any(texts):
+            texts = [(script.get('narration') or '').strip()]
+            spans = None
+        return self.subtitle_service.align_narration(pcm, sample_rate, texts, spans)
+
+    def _attach_soft_subtitles(self, video_path: Path, subtitles: List[SubtitleItem], language: str = 'en'):
+        """
+        Write .srt/.vtt sidecars next to the video and mux the subtitles in as a mov_text track
+
+        Streams are copied, so this costs no re-encode; if muxing fails the video is kept
+        as encoded and the sidecars still carry the subtitles.
+        """
+        srt_path = video_path.with_suffix('.srt')
+        self.subtitle_service.save_to_srt(subtitles, str(srt_path))
+        self.subtitle_service.save_to_vtt(subtitles, str(video_path.with_suffix('.vtt')))
+
+        # ISO 639-2 codes for the track's language tag
+        language_tags = {'en': 'eng', 'english': 'eng', 'zh': 'zho', 'chinese': 'zho', 'ar': 'ara', 'arabic': 'ara'}
+        muxed_path = video_path.with_name(f"{video_path.stem}_subs{video_path.suffix}")
+        try:
+            process = subprocess.run(
+                [imageio_ffmpeg.get_ffmpeg_exe(), '-v', 'error', '-y',
+                 '-i', str(video_path), '-i', str(srt_path),
+                 '-map', '0', '-map', '1', '-c', 'copy', '-c:s', 'mov_text',
+                 '-metadata:s:s:0', f"language={language_tags.get(language.lower(), 'und')}",
+                 str(muxed_path)],
+                capture_output=True
+            )
+            if process.returncode != 0:
+                raise Exception(process.stderr.decode(errors='replace').strip())
+            os.replace(muxed_path, video_path)
+            logger.info(f"Muxed {len(subtitles)} subtitles as a soft track")
+        except Exception as e:
+            logger.warning(f"Failed to mux soft subtitles (sidecars kept): {e}")
+        finally:
+            muxed_path.unlink(missing_ok=True)
+
+    def _plan_timeline(self, video_items, clip_probes, target_resolution, subtitle_position: str,
+                       total_duration: float, clip_duration: float, scene_timings=None) -> Timeline:
+        """
+        Plan the render's timeline from the probed clips, without opening any decoder
+
+        Args:
+            video_items: (source path, scene index) of each usable clip, in clip order
+            clip_probes: ClipProbe of each source
+            scene_timings: Scene spans to cut clips to (None = uniform clip_duration cuts)
+
+        Returns:
+            Timeline with its segments and the probes of the sources they use
+        """
+        scene_cuts = self._scene_cuts(scene_timings, video_items, [scene for _, scene in video_items], total_duration)
+        if scene_cuts:
+            # Cut each scene's clip to exactly the time its narration occupies
+            logger.info(f"Scene-aligned cuts: {[round(duration, 2) for _, duration in scene_cuts]}")
+        else:
+            # Use user-specified clip duration (with bounds)
+            target_clip_duration = max(2, min(clip_duration, total_duration / len(video_items)))
+            clips_needed = int(total_duration / target_clip_duration) + 1
+            logger.info(f"Target clip duration: {target_clip_duration}s, clips needed: {clips_needed}")
+
+            # Cycle through available clips to fill the duration
+            scene_cuts = [
+                (video_items[i % len(video_items)], target_clip_duration) for i in range(clips_needed)
+            ]
+
+        # The render as an edit decision list (returned in script['timeline'])
+        timeline = Timeline(target_resolution[0], target_resolution[1], fps=24, subtitle_position=subtitle_position)
+        for (source, scene), cut_duration in scene_cuts:
+            timeline.append_segment(source, cut_duration, scene)
+        timeline.sources = {segment.source: clip_probes[segment.source] for segment in timeline.segments}
+        copyable = sum(timeline.stream_copyable(segment) for segment in timeline.segments)
+        logger.info(f"Timeline planned: {len(timeline.segments)} segments, {copyable} stream-copyable")
+        return timeline
+
+    def _scene_cuts(self, scene_timings, video_items, video_scenes, total_duration: float):
+        """
+        Plan one cut per scene from the voiceover's scene timings
+
+        Each clip covers its scene from the scene's start until the next clip's scene
+        starts (so pauses and scenes without a clip stay covered); the first cut starts
+        at 0 and the last runs to the end of the audio.
+
+        Returns:
+            List of (video item, duration), or None when cuts can't be aligned to scenes
+        """
+        if not scene_timings or not video_items or any(scene is None for scene in video_scenes):
+            return None
+        if len(set(video_scenes)) != len(video_scenes) or max(video_scenes) >= len(scene_timings):
+            return None
+
+        ordered = sorted(zip(video_scenes, video_items), key=lambda item: item[0])
+        starts = [0.0] + [scene_timings[scene]['start'] for scene, _ in ordered[1:]]
+        ends = starts[1:] + [total_duration]
+
+        cuts = [(video, end - start) for (_, video), start, end in zip(ordered, starts, ends)]
+        if any(duration <= 0 for _, duration in cuts):
+            return None
+        return cuts
+
     def _add_subtitles_to_video(self, video_clip, subtitles: List[SubtitleItem], position: str = 'bottom'):
         """
         Add subtitle overlays to video
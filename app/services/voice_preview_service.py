@@ -4,7 +4,6 @@ Generates short audio samples for voice testing
 """
 
 import os
-import azure.cognitiveservices.speech as speechsdk
 from pathlib import Path
 import logging
 
@@ -14,14 +13,14 @@ logger = logging.getLogger(__name__)
 class VoicePreviewService:
     """Service for generating voice preview samples"""
 
-    def __init__(self, speech_config):
+    def __init__(self, tts_backend):
         """
         Initialize voice preview service
 
         Args:
-            speech_config: Azure SpeechConfig object
+            tts_backend: TTSBackend used for synthesis (shared with voiceover generation)
         """
-        self.speech_config = speech_config
+        self.tts_backend = tts_backend
 
     def generate_preview(self, voice_id: str, text: str = None, output_path: str = None) -> str:
         """
@@ -67,37 +66,12 @@ class VoicePreviewService:
             output_path = str(temp_dir / f"voice_preview_{os.urandom(4).hex()}.wav")
 
         try:
-            # Configure speech synthesis
-            speech_config = speechsdk.SpeechConfig(
-                subscription=self.speech_config.subscription_key,
-                region=self.speech_config.region
-            )
-            speech_config.speech_synthesis_voice_name = voice_id
+            result = self.tts_backend.synthesize(voice_id, text)
 
-            # Configure audio output
-            audio_config = speechsdk.audio.AudioOutputConfig(filename=output_path)
-            synthesizer = speechsdk.SpeechSynthesizer(
-                speech_config=speech_config,
-                audio_config=audio_config
-            )
-
-            # Generate speech
-            result = synthesizer.speak_text_async(text).get()
-
-            if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-                logger.info(f"Voice preview generated: {voice_id} -> {output_path}")
-                return output_path
-            elif result.reason == speechsdk.ResultReason.Canceled:
-                cancellation = result.cancellation_details
-                # Clean up partial file
-                if os.path.exists(output_path):
-                    os.unlink(output_path)
-                raise Exception(f"Voice preview canceled: {cancellation.reason}. Error: {cancellation.error_details}")
-            else:
-                # Clean up partial file
-                if os.path.exists(output_path):
-                    os.unlink(output_path)
-                raise Exception(f"Voice preview failed: {result.reason}")
+            with open(output_path, 'wb') as f:
+                f.write(result.audio)
+            logger.info(f"Voice preview generated: {voice_id} -> {output_path}")
+            return output_path
 
         except Exception as e:
             # Clean up on error
@@ -0,0 +1,221 @@
+"""
+PCM audio helpers for synthesized narration
+Works on 16-bit mono PCM, the format voiceovers are synthesized in, and keeps
+voiceovers in memory from synthesis to the encoder
+"""
+
+import io
+import wave
+import subprocess
+from typing import List, Tuple, Optional
+
+import numpy as np
+import imageio_ffmpeg
+
+SAMPLE_WIDTH = 2  # bytes per 16-bit sample
+
+
+def wav_to_pcm(data: bytes) -> Tuple[bytes, int]:
+    """
+    Extract raw PCM from WAV (RIFF) bytes
+
+    Returns:
+        Tuple of (16-bit mono PCM bytes, sample rate)
+    """
+    with wave.open(io.BytesIO(data), 'rb') as wav:
+        if wav.getsampwidth() != SAMPLE_WIDTH or wav.getnchannels() != 1:
+            raise ValueError("Expected 16-bit mono WAV audio")
+        return wav.readframes(wav.getnframes()), wav.getframerate()
+
+
+def read_pcm(path: str, sample_rate: int = 16000) -> Tuple[bytes, int]:
+    """
+    Read an audio file as 16-bit mono PCM
+
+    16-bit mono WAV is read directly; anything else is decoded with ffmpeg at sample_rate.
+
+    Returns:
+        Tuple of (16-bit mono PCM bytes, sample rate)
+    """
+    try:
+        with open(path, 'rb') as f:
+            return wav_to_pcm(f.read())
+    except (ValueError, EOFError, wave.Error):
+        pass
+
+    process = subprocess.run(
+        [imageio_ffmpeg.get_ffmpeg_exe(), '-v', 'error', '-i', path,
+         '-f', 's16le', '-acodec', 'pcm_s16le', '-ac', '1', '-ar', str(sample_rate), '-'],
+        capture_output=True
+    )
+    if process.returncode != 0:
+        raise Exception(f"Failed to decode audio {path}: {process.stderr.decode(errors='replace').strip()}")
+    return process.stdout, sample_rate
+
+
+def pcm_duration(pcm: bytes, sample_rate: int) -> float:
+    """Duration of 16-bit mono PCM in seconds"""
+    return len(pcm) / (SAMPLE_WIDTH * sample_rate)
+
+
+def silence(seconds: float, sample_rate: int) -> bytes:
+    """16-bit mono PCM silence of the given length"""
+    return b'\x00' * (int(round(seconds * sample_rate)) * SAMPLE_WIDTH)
+
+
+def trim_silence(pcm: bytes, sample_rate: int, threshold: int = 300, margin: float = 0.02) -> Tuple[bytes, float]:
+    """
+    Strip leading and trailing silence, keeping a short margin around the speech
+
+    Args:
+        pcm: 16-bit mono PCM
+        sample_rate: Sample rate in Hz
+        threshold: Absolute sample value below which audio counts as silence
+        margin: Seconds of audio kept before the first and after the last loud sample
+
+    Returns:
+        Tuple of (trimmed PCM, seconds removed from the start)
+    """
+    samples = np.frombuffer(pcm, dtype='<i2')
+    loud = np.flatnonzero(np.abs(samples.astype(np.int32)) > threshold)
+    if loud.size == 0:
+        return b'', 0.0
+
+    keep = int(margin * sample_rate)
+    start = max(int(loud[0]) - keep, 0)
+    end = min(int(loud[-1]) + 1 + keep, samples.size)
+    return samples[start:end].tobytes(), start / sample_rate
+
+
+def split_at_silence(pcm: bytes, sample_rate: int, target_seconds: float = 30.0, min_silence: float = 0.3,
+                     threshold: int = 300) -> List[Tuple[int, int]]:
+    """
+    Plan chunks of roughly target_seconds that start and end inside pauses
+
+    Each chunk ends at the middle of the first pause of at least min_silence seconds after
+    target_seconds of audio; stretches with no such pause are cut hard at twice that length.
+
+    Args:
+        pcm: 16-bit mono PCM
+        sample_rate: Sample rate in Hz
+        target_seconds: Minimum chunk length before a pause can end it
+        min_silence: Shortest pause counted as a boundary
+        threshold: Absolute sample value below which audio counts as silence
+
+    Returns:
+        List of (start, end) sample indexes covering the whole audio
+    """
+    samples = np.frombuffer(pcm, dtype='<i2')
+    total = samples.size
+    if total == 0:
+        return []
+
+    # Loudness per 20ms frame
+    frame = max(int(0.02 * sample_rate), 1)
+    frames = total // frame
+    peaks = np.abs(samples[:frames * frame].astype(np.int32)).reshape(frames, frame).max(axis=1) if frames else np.zeros(0)
+    quiet = np.concatenate(([False], peaks <= threshold, [False]))
+
+    # Middles of quiet runs long enough to be pauses
+    edges = np.flatnonzero(np.diff(quiet.astype(np.int8)))
+    min_frames = max(int(min_silence / 0.02), 1)
+    cuts = [int((start + end) // 2) * frame for start, end in zip(edges[::2], edges[1::2])
+            if end - start >= min_frames]
+
+    target = max(int(target_seconds * sample_rate), 1)
+    chunks = []
+    start = 0
+    for cut in cuts + [total]:
+        while cut - start > 2 * target:
+            chunks.append((start, start + target))
+            start += target
+        if cut - start >= target or cut == total:
+            if cut > start:
+                chunks.append((start, cut))
+            start = cut
+    return chunks
+
+
+def speech_segments(pcm: bytes, sample_rate: int, threshold: int = 300, relative: float = 0.05,
+                    min_silence: float = 0.15, min_speech: float = 0.05) -> List[Tuple[float, float]]:
+    """
+    Find speech in PCM with a frame energy voice activity pass
+
+    A 20ms frame is speech when its RMS exceeds both threshold and relative times the
+    95th percentile frame RMS; pauses shorter than min_silence are bridged and bursts
+    shorter than min_speech dropped.
+
+    Args:
+        pcm: 16-bit mono PCM
+        sample_rate: Sample rate in Hz
+        threshold: Absolute RMS below which a frame is always silence
+        relative: Fraction of the loud-frame level below which a frame is silence
+        min_silence: Shortest pause in seconds that separates two segments
+        min_speech: Shortest segment in seconds that is kept
+
+    Returns:
+        List of (start, end) speech segments in seconds
+    """
+    samples = np.frombuffer(pcm, dtype='<i2')
+    frame = max(int(0.02 * sample_rate), 1)
+    frames = samples.size // frame
+    if frames == 0:
+        return []
+
+    blocks = samples[:frames * frame].astype(np.float32).reshape(frames, frame)
+    rms = np.sqrt(np.mean(blocks * blocks, axis=1))
+    active = rms > max(threshold, relative * np.percentile(rms, 95))
+
+    def runs(mask):
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+        return edges[::2], edges[1::2]
+
+    # Bridge short pauses, then drop short bursts
+    starts, ends = runs(~active)
+    for start, end in zip(starts, ends):
+        if 0 < start and end < frames and end - start < min_silence / 0.02:
+            active[start:end] = True
+    starts, ends = runs(active)
+    keep = ends - starts >= max(min_speech / 0.02, 1)
+
+    seconds = frame / sample_rate
+    return [(float(start * seconds), float(end * seconds)) for start, end in zip(starts[keep], ends[keep])]
+
+
+def write_wav(path: str, pcm: bytes, sample_rate: int):
+    """Write 16-bit mono PCM to a WAV file"""
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(SAMPLE_WIDTH)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+
+
+class Voiceover:
+    """Synthesized narration kept in memory as 16-bit mono PCM"""
+
+    def __init__(self, pcm: bytes, sample_rate: int):
+        self.pcm = pcm
+        self.sample_rate = sample_rate
+
+    @property
+    def duration(self) -> float:
+        return pcm_duration(self.pcm, self.sample_rate)
+
+    def to_array(self, sample_rate: Optional[int] = None) -> np.ndarray:
+        """
+        Samples as a float32 (n, 1) array in [-1, 1], as MoviePy's AudioArrayClip expects
+
+        Args:
+            sample_rate: Resample (linear interpolation) to this rate; defaults to the native rate
+        """
+        samples = np.frombuffer(self.pcm, dtype='<i2').astype(np.float32) / 32768.0
+        if sample_rate and sample_rate != self.sample_rate and samples.size:
+            count = int(round(samples.size * sample_rate / self.sample_rate))
+            positions = np.arange(count, dtype=np.float64) * (self.sample_rate / sample_rate)
+            samples = np.interp(positions, np.arange(samples.size), samples).astype(np.float32)
+        return samples.reshape(-1, 1)
+
+    def write_wav(self, path: str):
+        """Write the narration to a WAV file (for consumers that need a file)"""
+        write_wav(path, self.pcm, self.sample_rate)
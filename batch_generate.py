@@ -0,0 +1,206 @@
+"""
+Batch video generation from a CSV or JSONL file of topics
+Renders every row through a worker pool sharing one VideoService (and its caches),
+and records each result in a JSONL manifest so interrupted runs can be resumed.
+
+Usage:
+    python batch_generate.py topics.csv [--workers 2] [--manifest results.jsonl] [--output-dir ./output/batch]
+
+Input columns / keys: topic (required), duration, voice, quality, aspect_ratio,
+language, clip_duration, align_scenes, subtitle_position, custom_script
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import hashlib
+import argparse
+import threading
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Add app directory to path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.config import load_config
+from app.services.video_service import VideoService
+
+# Defaults applied to columns missing from a row
+ROW_DEFAULTS = {
+    'duration': 60,
+    'voice': 'en-US-JennyNeural',
+    'quality': 'basic',
+    'aspect_ratio': '16:9',
+    'language': 'en',
+    'clip_duration': 5,
+    'align_scenes': False,
+    'subtitle_position': 'bottom',
+    'custom_script': None
+}
+
+
+def load_topics(input_path: Path) -> list:
+    """Read topic rows from a CSV or JSONL file"""
+    rows = []
+    with open(input_path, 'r', encoding='utf-8') as f:
+        if input_path.suffix.lower() in ('.jsonl', '.ndjson'):
+            for line in f:
+                line = line.strip()
+                if line:
+                    rows.append(json.loads(line))
+        else:
+            rows = list(csv.DictReader(f))
+
+    params_list = []
+    for row in rows:
+        # Empty CSV cells fall back to defaults
+        row = {k: v for k, v in row.items() if v not in (None, '')}
+        params = dict(ROW_DEFAULTS, **row)
+        params['duration'] = int(params['duration'])
+        params['clip_duration'] = int(params['clip_duration'])
+        if isinstance(params['align_scenes'], str):
+            params['align_scenes'] = params['align_scenes'].strip().lower() in ('1', 'true', 'yes')
+        params['music_enabled'] = False
+        params['music_volume'] = 0.0
+        params['music_path'] = None
+        params.setdefault('topic', '')
+        params_list.append(params)
+    return params_list
+
+
+def row_key(index: int, params: dict) -> str:
+    """Stable key for a row, so edited rows are re-rendered on resume"""
+    payload = json.dumps([index, params], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def load_completed(manifest_path: Path) -> dict:
+    """Read completed rows from an existing manifest"""
+    completed = {}
+    if not manifest_path.exists():
+        return completed
+
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get('status') == 'completed' and entry.get('video_path') and os.path.exists(entry['video_path']):
+                completed[entry['key']] = entry
+    return completed
+
+
+def run_batch(input_path: Path, manifest_path: Path, workers: int, output_dir: str = None):
+    """Render all rows of the topics file"""
+    config = load_config()
+    if output_dir:
+        config['video']['output_dir'] = output_dir
+
+    # Share script, voiceover and clip caches across the whole batch (and across resumed runs)
+    cache_root = Path(config['video'].get('output_dir', './output')) / '.cache'
+    if not config['video'].get('clip_cache_dir'):
+        config['video']['clip_cache_dir'] = str(cache_root / 'clips')
+    if not config['video'].get('script_cache_dir'):
+        config['video']['script_cache_dir'] = str(cache_root / 'scripts')
+    if not config['video'].get('tts_cache_dir'):
+        config['video']['tts_cache_dir'] = str(cache_root / 'tts')
+
+    video_service = VideoService(config)
+
+    rows = load_topics(input_path)
+    completed = load_completed(manifest_path)
+    manifest_lock = threading.Lock()
+
+    pending = []
+    skipped_count = 0
+    for index, params in enumerate(rows):
+        key = row_key(index, params)
+        if key in completed:
+            skipped_count += 1
+            print(f"[{index + 1}/{len(rows)}] SKIP: {params['topic'][:50]} (already rendered)")
+        elif not params['topic'] and not params.get('custom_script'):
+            print(f"[{index + 1}/{len(rows)}] SKIP: row has no topic")
+        else:
+            pending.append((index, key, params))
+
+    print(f"Rendering {len(pending)} of {len(rows)} videos with {workers} worker(s)")
+    print(f"Manifest: {manifest_path.absolute()}\n")
+
+    def render(index, key, params):
+        started = time.time()
+        entry = {
+            'row': index,
+            'key': key,
+            'topic': params['topic'],
+            'params': params,
+            'started_at': datetime.utcnow().isoformat()
+        }
+        try:
+            result = video_service.generate_video(params)
+            entry.update(status='completed', video_path=result['video_path'], error=None)
+        except Exception as e:
+            entry.update(status='failed', video_path=None, error=str(e))
+        entry['elapsed_seconds'] = round(time.time() - started, 1)
+
+        with manifest_lock:
+            with open(manifest_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+        return entry
+
+    success_count = 0
+    error_count = 0
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(render, *item) for item in pending]
+        for future in as_completed(futures):
+            entry = future.result()
+            label = f"[{entry['row'] + 1}/{len(rows)}] {entry['topic'][:50]}"
+            if entry['status'] == 'completed':
+                success_count += 1
+                print(f"    ✓ {label} -> {entry['video_path']} ({entry['elapsed_seconds']}s)")
+            else:
+                error_count += 1
+                print(f"    ✗ {label}: {entry['error']}")
+
+    print("\n" + "="*60)
+    print(f"SUMMARY:")
+    print(f"  Total rows: {len(rows)}")
+    print(f"  ↷ Skipped (already rendered): {skipped_count}")
+    print(f"  ✓ Success: {success_count}")
+    print(f"  ✗ Errors: {error_count}")
+    print(f"  Manifest: {manifest_path.absolute()}")
+    print("="*60)
+
+    return error_count == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render many NanoTik videos from a CSV or JSONL topics file")
+    parser.add_argument('input', help="CSV or JSONL file with one video per row")
+    parser.add_argument('--workers', type=int, default=2, help="Videos to render concurrently (default: 2)")
+    parser.add_argument('--manifest', help="Results manifest (default: <input>.manifest.jsonl)")
+    parser.add_argument('--output-dir', help="Directory for rendered videos (default: video.output_dir)")
+    args = parser.parse_args()
+
+    input_path = Path(args.input)
+    if not input_path.exists():
+        print(f"ERROR: Topics file not found: {input_path}")
+        sys.exit(1)
+
+    manifest_path = Path(args.manifest) if args.manifest else input_path.with_name(input_path.name + '.manifest.jsonl')
+
+    ok = run_batch(input_path, manifest_path, max(1, args.workers), args.output_dir)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,6 @@ Run this once to create all preview files and save API costs
 import os
 import sys
 from pathlib import Path
-import azure.cognitiveservices.speech as speechsdk
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -17,6 +16,7 @@ sys.path.insert(0, os.path.dirname(__file__))
 
 from app.utils.voices import VOICE_CATALOG
 from app.services.voice_preview_service import VoicePreviewService
+from app.services.tts_backend import AzureTTSBackend
 from app.config import load_config
 
 # Preview texts for different languages
@@ -55,11 +55,8 @@ def generate_all_voice_previews():
         print("Please set AZURE_SPEECH_KEY in your .env file or config.toml")
         return
 
-    # Initialize speech config
-    speech_config = speechsdk.SpeechConfig(subscription=speech_key, region=speech_region)
-
     # Initialize voice preview service
-    preview_service = VoicePreviewService(speech_config)
+    preview_service = VoicePreviewService(AzureTTSBackend(speech_key, speech_region))
 
     # Create output directory
     output_dir = Path('./voice_previews')
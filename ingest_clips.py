@@ -0,0 +1,79 @@
+"""
+Add video files to the local clip library
+Copies each clip into video.clip_library_dir and indexes its tags and description, so
+scenes matching them render from local disk instead of a stock footage search.
+
+Usage:
+    python ingest_clips.py clip1.mp4 [clip2.mp4 ...] --tags "city, night, traffic" [--description "..."]
+    python ingest_clips.py ./footage/ [--library-dir ./library]
+
+Without --tags, tags are taken from each file name (e.g. city_night_traffic.mp4).
+"""
+
+import os
+import re
+import sys
+import argparse
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Add app directory to path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.config import load_config
+from app.services.clip_library import ClipLibrary
+from app.services.clip_probe import probe_clip
+
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.m4v', '.webm', '.mkv')
+
+
+def clip_metadata(path: Path) -> dict:
+    """Duration, frame size, frame rate and codec of a clip"""
+    probe = probe_clip(str(path))
+    return {'duration': round(probe.duration, 2), 'width': probe.width, 'height': probe.height,
+            'fps': probe.fps, 'codec': probe.codec}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add video clips to the NanoTik local clip library")
+    parser.add_argument('paths', nargs='+', help="Video files or directories of video files")
+    parser.add_argument('--tags', help="Comma-separated tags for every clip (default: from file names)")
+    parser.add_argument('--description', default='', help="Description indexed with every clip")
+    parser.add_argument('--library-dir', help="Library directory (default: video.clip_library_dir)")
+    args = parser.parse_args()
+
+    config = load_config()
+    library_dir = args.library_dir or config['video'].get('clip_library_dir', '')
+    if not library_dir:
+        print("ERROR: No library directory. Set video.clip_library_dir or pass --library-dir.")
+        sys.exit(1)
+
+    files = []
+    for path in map(Path, args.paths):
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob('*') if p.suffix.lower() in VIDEO_EXTENSIONS))
+        elif path.exists():
+            files.append(path)
+        else:
+            print(f"WARNING: Not found: {path}")
+
+    library = ClipLibrary(library_dir)
+    errors = 0
+    for index, path in enumerate(files, 1):
+        tags = args.tags.split(',') if args.tags else re.split(r'[\W_]+', path.stem)
+        try:
+            record = library.ingest(str(path), tags, args.description, clip_metadata(path))
+            print(f"[{index}/{len(files)}] ✓ {path.name} -> {record['id']} ({', '.join(record['tags'])})")
+        except Exception as e:
+            errors += 1
+            print(f"[{index}/{len(files)}] ✗ {path.name}: {e}")
+
+    print(f"\nLibrary: {Path(library_dir).absolute()} ({len(library)} clips)")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ Enhanced version of MoneyPrinterTurbo with modern UI and payment integration
 import streamlit as st
 import os
 import sys
+import time
 from pathlib import Path
 
 # Add parent directory to path
@@ -29,7 +30,6 @@ def get_services():
     from app.services.voice_preview_service import VoicePreviewService
     from app.services.auth_service import get_auth_service
     from app.database import get_database
-    import azure.cognitiveservices.speech as speechsdk
 
     config = load_config()
     db = get_database()
@@ -37,12 +37,9 @@ def get_services():
     payment_service = PaymentService()
     video_service = VideoService(config)
 
-    # Initialize voice preview service
-    speech_key = config['azure'].get('speech_key', '')
-    speech_region = config['azure'].get('speech_region', 'eastus')
-    if speech_key:
-        speech_config = speechsdk.SpeechConfig(subscription=speech_key, region=speech_region)
-        voice_preview_service = VoicePreviewService(speech_config)
+    # Initialize voice preview service (same TTS backend as voiceovers)
+    if video_service.tts_backend:
+        voice_preview_service = VoicePreviewService(video_service.tts_backend)
     else:
         voice_preview_service = None
 
@@ -499,6 +496,13 @@ def render_video_generator():
         with st.expander(get_text('video.advanced', st.session_state.language)):
             col1, col2 = st.columns(2)
 
+            with col1:
+                align_scenes = st.checkbox(
+                    "Sync clips to narration",
+                    value=False,
+                    help="🎬 **Scene Sync**: Each scene's clip stays on screen exactly while its part of the narration is spoken.\n\n• When enabled, **Clip Duration is ignored**\n• When disabled, clips switch every Clip Duration seconds"
+                )
+
             with col2:
                 clip_duration = st.slider(
                     "Clip Duration (seconds)",
@@ -506,7 +510,7 @@ def render_video_generator():
                     max_value=10,
                     value=5,
                     step=1,
-                    help="🎞️ **Clip Switching Frequency**: How long each video scene appears before switching.\n\n• **2-3s**: Fast-paced, high energy (TikTok style)\n• **5-6s**: Balanced, recommended for most content\n• **8-10s**: Slower pace, cinematic feel"
+                    help="🎞️ **Clip Switching Frequency**: How long each video scene appears before switching.\n\n• **2-3s**: Fast-paced, high energy (TikTok style)\n• **5-6s**: Balanced, recommended for most content\n• **8-10s**: Slower pace, cinematic feel\n\nNot used when **Sync clips to narration** is enabled."
                 )
 
             # Background music settings
@@ -568,6 +572,7 @@ def render_video_generator():
                     subtitle_position=subtitle_position,
                     aspect_ratio=aspect_ratio,
                     clip_duration=clip_duration,
+                    align_scenes=align_scenes,
                     custom_script=custom_script
                 )
 
@@ -610,7 +615,8 @@ def render_video_generator():
 
 
 def generate_video(topic, quality, duration, voice, music_enabled, music_volume,
-                   music_file, subtitle_position, aspect_ratio, clip_duration, custom_script=None):
+                   music_file, subtitle_position, aspect_ratio, clip_duration, custom_script=None,
+                   align_scenes=False):
     """Generate video based on user input"""
     # Check for free trial - get user from database
     if st.session_state.get('authenticated'):
@@ -652,6 +658,7 @@ def generate_video(topic, quality, duration, voice, music_enabled, music_volume,
             'subtitle_position': subtitle_position,
             'aspect_ratio': aspect_ratio,
             'clip_duration': clip_duration,
+            'align_scenes': align_scenes,
             'custom_script': custom_script
         }
 
@@ -670,6 +677,7 @@ def process_video_generation():
     # Progress tracking
     progress_bar = st.progress(0)
     status_text = st.empty()
+    st.button("Cancel", on_click=cancel_video_generation, key='cancel_render')
 
     # Progress callback function
     def update_progress(progress, message):
@@ -687,6 +695,7 @@ def process_video_generation():
     subtitle_position = params['subtitle_position']
     aspect_ratio = params['aspect_ratio']
     clip_duration = params['clip_duration']
+    align_scenes = params.get('align_scenes', False)
     custom_script = params['custom_script']
 
     # Check for free trial
@@ -701,57 +710,59 @@ def process_video_generation():
     cost_map = {'basic': 1, 'hd': 2, 'premium': 3}
     cost = cost_map[quality]
 
+    render_config = services['config'].get('render', {})
+    queue_mode = render_config.get('mode', 'inprocess') == 'queue'
+
+    from app.services.render_scheduler import determine_lane
+    from app.services.render_cancellation import CancellationToken
+
     try:
         # Save uploaded music file temporarily if provided
         music_path = None
         if music_enabled and music_file:
             import tempfile
-            temp_music = tempfile.NamedTemporaryFile(delete=False, suffix='.mp3')
+            # Queued jobs render on another host, so the music must live on the shared path
+            music_dir = None
+            if queue_mode:
+                music_dir = Path(render_config.get('shared_dir', './shared')) / 'music'
+                music_dir.mkdir(parents=True, exist_ok=True)
+            temp_music = tempfile.NamedTemporaryFile(delete=False, suffix='.mp3', dir=music_dir)
             temp_music.write(music_file.read())
             temp_music.close()
             music_path = temp_music.name
 
-        # Step 1: Generate or use custom script
-        if custom_script:
-            update_progress(10, "Using custom script...")
-            # Parse custom script into expected format
-            script = {
-                'narration': custom_script,
-                'scenes': [{'description': topic or 'Custom video', 'narration': custom_script}],
-                'scene_count': 1,
-                'language': st.session_state.language
-            }
+        render_params = {
+            'topic': topic,
+            'duration': duration,
+            'voice': voice,
+            'language': st.session_state.language,
+            'quality': quality,
+            'aspect_ratio': aspect_ratio,
+            'clip_duration': clip_duration,
+            'align_scenes': align_scenes,
+            'subtitle_position': subtitle_position,
+            'music_enabled': music_enabled,
+            'music_volume': music_volume,
+            'music_path': music_path,
+            'custom_script': custom_script,
+            # Credit renders are served ahead of free-trial renders
+            'lane': determine_lane(has_free_trial)
+        }
+
+        if queue_mode:
+            video_path = wait_for_render_job(render_params, update_progress)
         else:
-            update_progress(10, get_text('video.generating_script', st.session_state.language))
-            script = video_service.generate_script(topic, duration, st.session_state.language)
-            script['language'] = st.session_state.language
-
-        # Step 2: Generate voiceover
-        update_progress(30, get_text('video.generating_voice', st.session_state.language))
-
-        audio_path = video_service.generate_voiceover(script, voice, st.session_state.language)
-
-        # Step 3: Search for video clips
-        update_progress(50, get_text('video.searching_clips', st.session_state.language))
-
-        clips = video_service.search_video_clips(script)
-
-        # Step 4: Compose video (with detailed progress updates)
-        update_progress(60, get_text('video.composing', st.session_state.language))
-
-        video_path = video_service.compose_video(
-            clips=clips,
-            audio_path=audio_path,
-            script=script,
-            subtitle_position=subtitle_position,
-            quality=quality,
-            music_enabled=music_enabled,
-            music_volume=music_volume,
-            music_path=music_path,
-            aspect_ratio=aspect_ratio,
-            clip_duration=clip_duration,
-            progress_callback=update_progress
-        )
+            # Cancel kills this render's ffmpeg processes through the session's token
+            cancel_token = CancellationToken()
+            st.session_state.render_cancel_token = cancel_token
+            try:
+                result = video_service.generate_video(
+                    render_params, progress_callback=update_progress, cancel_token=cancel_token
+                )
+            finally:
+                if st.session_state.get('render_cancel_token') is cancel_token:
+                    del st.session_state.render_cancel_token
+            video_path = result['video_path']
 
         # Step 5: Finalize
         progress_bar.progress(100)
@@ -812,6 +823,120 @@ def process_video_generation():
                 pass
 
 
+def wait_for_render_job(render_params, update_progress):
+    """Enqueue a render job for the worker pool and block until it finishes"""
+    from app.services.render_scheduler import LANE_WEIGHTS
+    from app.services.render_dedup import request_fingerprint
+
+    render_config = services['config']['render']
+    poll_interval = render_config.get('poll_interval', 2.0)
+    follow_timeout = render_config.get('follow_timeout', 3600)
+
+    # Serve a recent identical render straight away
+    fingerprint = request_fingerprint(render_params)
+    dedup_window = int(render_config.get('dedup_window', 3600))
+    if fingerprint and dedup_window > 0:
+        reusable = db.find_reusable_render_job(fingerprint, dedup_window)
+        if reusable and os.path.exists(reusable['output_path']):
+            return reusable['output_path']
+
+    # Identical queued/running jobs are joined instead of enqueued again
+    lane = render_params['lane']
+    lane_weights = render_config.get('lane_weights') or LANE_WEIGHTS
+
+    def enqueue():
+        return db.create_render_job(
+            st.session_state.user_id,
+            render_params,
+            lane=lane,
+            priority=lane_weights.get(lane, 0),
+            fingerprint=fingerprint
+        )
+
+    job = enqueue()
+    st.session_state.render_job_id = job['id']
+    update_progress(5, "Waiting for a render worker...")
+
+    try:
+        while True:
+            try:
+                job = follow_render_job(job['id'], update_progress, poll_interval, follow_timeout)
+            except TimeoutError:
+                # A wedged job must not pin the session; free its worker if it's ours
+                if job['user_id'] == st.session_state.user_id:
+                    db.request_render_job_cancel(job['id'])
+                st.session_state.pop('render_job_id', None)
+                raise Exception("Video generation timed out")
+
+            if job['status'] == 'completed':
+                st.session_state.pop('render_job_id', None)
+                return job['output_path']
+            if job['status'] == 'failed':
+                raise Exception(job.get('error') or "Render job failed")
+            if job['user_id'] == st.session_state.user_id:
+                raise Exception("Video generation was cancelled")
+            # We joined another user's identical job and they cancelled it
+            job = enqueue()
+            st.session_state.render_job_id = job['id']
+    except Exception:
+        raise
+    except BaseException:
+        # Session closed or rerun: the user abandoned this render, so free its worker
+        if job['user_id'] == st.session_state.user_id:
+            db.request_render_job_cancel(job['id'])
+        raise
+
+
+def follow_render_job(job_id, update_progress, poll_interval=2.0, timeout=None):
+    """
+    Show a render job's live progress (published by whichever worker runs it)
+    until the job finishes, and return the finished job row
+
+    Raises:
+        TimeoutError: If the job hasn't finished within timeout seconds
+    """
+    from app.database import RENDER_JOB_TERMINAL_STATES
+
+    deadline = time.monotonic() + timeout if timeout else None
+
+    def show(event):
+        if not event or event.get('percent') is None:
+            return
+        message = event.get('message') or ""
+        if event.get('eta_seconds') and event.get('stage') != 'waiting':
+            message = f"{message} (~{event['eta_seconds']}s left)"
+        update_progress(event['percent'], message)
+
+    for event in db.listen_render_job_progress(job_id, timeout=poll_interval):
+        if deadline and time.monotonic() > deadline:
+            raise TimeoutError(f"Render job {job_id} did not finish within {timeout}s")
+        if event is not None and event.get('status') == 'running':
+            show(event)
+            continue
+
+        # Subscribed, quiet or finished: the job row is authoritative
+        job = db.get_render_job(job_id)
+        if job['status'] in RENDER_JOB_TERMINAL_STATES:
+            return job
+        show(job.get('progress'))
+
+
+def cancel_video_generation():
+    """Cancel the running render (button callback, runs before the rerun)"""
+    job_id = st.session_state.pop('render_job_id', None)
+    if job_id:
+        job = db.get_render_job(job_id)
+        # A job joined through request dedup belongs to another user: only stop following it
+        if job and job['user_id'] == st.session_state.user_id:
+            db.request_render_job_cancel(job_id)
+    # An in-process render stops at its next cancellation point, killing its ffmpeg processes
+    cancel_token = st.session_state.pop('render_cancel_token', None)
+    if cancel_token:
+        cancel_token.cancel("Cancelled by user")
+    st.session_state.pop('pending_video_params', None)
+    st.session_state.render_cancelled = True
+
+
 def render_gallery():
     """Render user's video gallery from database"""
     st.header(get_text('gallery.title', st.session_state.language))
@@ -852,6 +977,10 @@ def main():
         st.error(st.session_state.payment_error)
         del st.session_state.payment_error
 
+    # Confirm a cancelled render
+    if st.session_state.pop('render_cancelled', False):
+        st.info("Video generation cancelled.")
+
     # Show video payment dialog if pending
     if 'pending_video_payment' in st.session_state:
         show_video_payment_dialog()
@@ -0,0 +1,48 @@
+"""
+NanoTik render worker
+Claims render jobs from the shared Postgres queue and renders them on this host.
+Run one per host (or several on large hosts) to scale rendering horizontally:
+
+    python worker.py [--worker-id NAME] [--concurrency N] [--once]
+"""
+
+import os
+import sys
+import signal
+import argparse
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.config import load_config
+from app.services.render_worker import RenderWorker
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NanoTik render worker")
+    parser.add_argument('--worker-id', help="Unique worker name (defaults to hostname:pid)")
+    parser.add_argument('--concurrency', type=int, help="Jobs to render at once (defaults to render.concurrency)")
+    parser.add_argument('--once', action='store_true', help="Process at most one job per slot and exit")
+    args = parser.parse_args()
+
+    config = load_config()
+    if args.concurrency:
+        config['render']['concurrency'] = args.concurrency
+
+    worker = RenderWorker(config, worker_id=args.worker_id)
+
+    # Finish the current job before exiting on SIGTERM/SIGINT
+    def handle_signal(signum, frame):
+        worker.stop()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    worker.run(once=args.once)
+
+
+if __name__ == "__main__":
+    main()